@@ -0,0 +1,10 @@
+"""End-to-end API benchmark: server.app in-process against a local mongod.
+
+The Emergent auth backend is a local HTTP stub, StripeCheckout is a stand-in
+object, and Cloudinary signing needs no network. Seeds a synthetic catalog,
+drives weighted concurrent scenarios and writes per-route throughput and
+latency percentiles as JSON so runs can be compared across commits.
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.api_bench --scale 1 --duration 30 --out run.json
+    python -m benchmarks.api_bench --compare base.json run.json
+"""
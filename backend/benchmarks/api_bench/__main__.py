@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def parse_mix(raw: str, scenarios) -> dict:
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        if name not in scenarios:
+            sys.exit(f"Unknown scenario {name!r}; choose from {', '.join(scenarios)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+async def run(args: argparse.Namespace) -> dict:
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.setdefault("LIVE_UPDATES_MODE", "local")
+
+    import httpx
+    import server
+    from . import stubs
+    from .recorder import Recorder
+    from .scenarios import SCENARIOS, DEFAULT_MIX, Client
+    from .seed import seed
+
+    mix = parse_mix(args.mix, SCENARIOS) if args.mix else DEFAULT_MIX
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+
+    auth_stub = await stubs.start_auth_stub()
+    port = auth_stub.sockets[0].getsockname()[1]
+    stubs.install(server, f"http://127.0.0.1:{port}/auth/v1/env/oauth/session-data")
+
+    server.mongo.open()  # seed before startup; the lifespan handler reuses this client
+    seed_started = time.perf_counter()
+    fixture = await seed(server, args.scale, rng)
+    seed_seconds = time.perf_counter() - seed_started
+
+    recorder = Recorder()
+    async with server.lifespan(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as http:
+            client = Client(http, recorder)
+
+            async def worker(worker_id: int, until: float, measured: bool) -> None:
+                worker_rng = random.Random(args.seed * 1000 + worker_id)
+                while time.perf_counter() < until:
+                    name = worker_rng.choices(names, weights)[0]
+                    start = time.perf_counter()
+                    await SCENARIOS[name](client, fixture, worker_rng)
+                    if measured:
+                        recorder.record_scenario(name, (time.perf_counter() - start) * 1000)
+
+            if args.warmup:
+                client.recorder = Recorder()
+                until = time.perf_counter() + args.warmup
+                await asyncio.gather(*(worker(i, until, False) for i in range(args.concurrency)))
+                client.recorder = recorder
+
+            recorder.started = time.perf_counter()
+            until = recorder.started + args.duration
+            await asyncio.gather(*(worker(i, until, True) for i in range(args.concurrency)))
+            recorder.stop()
+
+    auth_stub.close()
+    await auth_stub.wait_closed()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "scale": args.scale,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": mix,
+            "seed": args.seed,
+            "seeded": fixture.counts,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        **recorder.report(),
+    }
+
+def compare(base_path: str, new_path: str) -> dict:
+    with open(base_path) as fh:
+        base = json.load(fh)
+    with open(new_path) as fh:
+        new = json.load(fh)
+    rows = {}
+    for label in sorted(set(base["routes"]) | set(new["routes"])):
+        a, b = base["routes"].get(label), new["routes"].get(label)
+        if not a or not b:
+            rows[label] = {"base": a, "new": b}
+            continue
+        rows[label] = {
+            metric: {"base": a[metric], "new": b[metric],
+                     "change_pct": round((b[metric] - a[metric]) / a[metric] * 100, 1) if a[metric] else None}
+            for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+    return {"base": base["meta"]["commit"], "new": new["meta"]["commit"], "routes": rows}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.api_bench")
+    parser.add_argument("--scale", type=float, default=1.0, help="1.0 = 2k services, 10k orders, 550 users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of unmeasured load first")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", help="scenario weights, e.g. browse=60,search=20,login=20")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db-name", default=os.environ.get("BENCH_DB_NAME", "api_bench"))
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="diff two reports and exit")
+    args = parser.parse_args()
+
+    result = compare(*args.compare) if args.compare else asyncio.run(run(args))
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from typing import Dict, List
+import time
+
+from ..common import percentile
+
+class Recorder:
+    """Latency samples per route label ("GET /api/services/{service_id}") and per scenario."""
+
+    def __init__(self):
+        self.routes: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.scenarios: Dict[str, List[float]] = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, label: str, elapsed_ms: float, ok: bool) -> None:
+        self.routes.setdefault(label, []).append(elapsed_ms)
+        if not ok:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    def record_scenario(self, name: str, elapsed_ms: float) -> None:
+        self.scenarios.setdefault(name, []).append(elapsed_ms)
+
+    def stop(self) -> None:
+        self.finished = time.perf_counter()
+
+    def _summary(self, samples: List[float], seconds: float) -> dict:
+        samples = sorted(samples)
+        return {
+            "count": len(samples),
+            "throughput_rps": round(len(samples) / seconds, 2) if seconds else 0.0,
+            "p50_ms": round(percentile(samples, 50), 3),
+            "p95_ms": round(percentile(samples, 95), 3),
+            "p99_ms": round(percentile(samples, 99), 3),
+            "max_ms": round(samples[-1], 3) if samples else 0.0,
+        }
+
+    def report(self) -> dict:
+        seconds = (self.finished or time.perf_counter()) - self.started
+        routes = {}
+        for label, samples in sorted(self.routes.items()):
+            routes[label] = {**self._summary(samples, seconds), "errors": self.errors.get(label, 0)}
+        return {
+            "duration_s": round(seconds, 3),
+            "total_requests": sum(len(s) for s in self.routes.values()),
+            "total_errors": sum(self.errors.values()),
+            "routes": routes,
+            "scenarios": {name: self._summary(samples, seconds) for name, samples in sorted(self.scenarios.items())},
+        }
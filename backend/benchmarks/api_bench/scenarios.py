@@ -0,0 +1,112 @@
+from typing import Awaitable, Callable, Dict
+import json
+import random
+import time
+import uuid
+
+import httpx
+
+from .recorder import Recorder
+from .seed import CATEGORIES, PLATFORMS, SEARCH_TERMS, Fixture
+
+class Client:
+    """httpx client that records every call under its route template."""
+
+    def __init__(self, http: httpx.AsyncClient, recorder: Recorder):
+        self.http = http
+        self.recorder = recorder
+
+    async def call(self, label: str, method: str, url: str, token: str = None, **kwargs) -> httpx.Response:
+        headers = kwargs.pop("headers", {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        start = time.perf_counter()
+        resp = await self.http.request(method, url, headers=headers, **kwargs)
+        self.recorder.record(label, (time.perf_counter() - start) * 1000, resp.status_code < 400)
+        return resp
+
+async def browse(c: Client, f: Fixture, rng: random.Random) -> None:
+    params = {}
+    if rng.random() < 0.5:
+        params["category"] = rng.choice(CATEGORIES)
+    if rng.random() < 0.3:
+        params["platform"] = rng.choice(PLATFORMS)
+    page = await c.call("GET /api/services", "GET", "/api/services", params=params)
+    cursor = page.json().get("next_cursor") if page.status_code == 200 else None
+    if cursor and rng.random() < 0.3:
+        await c.call("GET /api/services", "GET", "/api/services", params={**params, "cursor": cursor})
+    service_id = rng.choice(f.service_ids)
+    await c.call("GET /api/services/{service_id}", "GET", f"/api/services/{service_id}")
+    await c.call("GET /api/services/{service_id}/reviews", "GET", f"/api/services/{service_id}/reviews")
+
+async def search(c: Client, f: Fixture, rng: random.Random) -> None:
+    params = {"search": rng.choice(SEARCH_TERMS)}
+    if rng.random() < 0.4:
+        params["category"] = rng.choice(CATEGORIES)
+    await c.call("GET /api/services?search", "GET", "/api/services", params=params)
+
+async def login(c: Client, f: Fixture, rng: random.Random) -> None:
+    resp = await c.call("POST /api/auth/session", "POST", "/api/auth/session",
+                        headers={"X-Session-ID": rng.choice(f.client_names)})
+    if resp.status_code == 200:
+        token = resp.json()["session_token"]
+        await c.call("GET /api/auth/me", "GET", "/api/auth/me", token=token)
+
+async def dashboard(c: Client, f: Fixture, rng: random.Random) -> None:
+    token = rng.choice(f.client_tokens + f.creator_tokens)
+    await c.call("GET /api/orders", "GET", "/api/orders", token=token, params={"limit": 20})
+    if token in f.creator_tokens:
+        await c.call("GET /api/creator/services", "GET", "/api/creator/services", token=token)
+        await c.call("GET /api/creator/stats", "GET", "/api/creator/stats", token=token)
+
+async def order_checkout_webhook(c: Client, f: Fixture, rng: random.Random) -> None:
+    token = rng.choice(f.client_tokens)
+    service_id = rng.choice(f.service_ids)
+    resp = await c.call("POST /api/orders", "POST", "/api/orders", token=token,
+                        json={"service_id": service_id, "tier_name": "Starter", "requirements": "bench run"})
+    if resp.status_code != 200:
+        return
+    order_id = resp.json()["order_id"]
+    resp = await c.call("POST /api/payments/checkout", "POST", "/api/payments/checkout", token=token,
+                        json={"order_id": order_id, "origin": "http://bench"})
+    if resp.status_code != 200:
+        return
+    session_id = resp.json()["session_id"]
+    event = {"id": f"evt_{uuid.uuid4().hex}", "type": "checkout.session.completed", "session_id": session_id,
+             "payment_status": "paid", "metadata": {"order_id": order_id}}
+    await c.call("POST /api/webhook/stripe", "POST", "/api/webhook/stripe", content=json.dumps(event),
+                 headers={"Stripe-Signature": "bench"})
+    await c.call("GET /api/orders/{order_id}", "GET", f"/api/orders/{order_id}", token=token)
+    await c.call("GET /api/payments/status/{session_id}", "GET", f"/api/payments/status/{session_id}", token=token)
+
+async def review(c: Client, f: Fixture, rng: random.Random) -> None:
+    if not f.reviewable:
+        return await browse(c, f, rng)
+    token, order_id = f.reviewable.pop()
+    await c.call("POST /api/reviews", "POST", "/api/reviews", token=token,
+                 json={"order_id": order_id, "rating": rng.randint(1, 5), "comment": "bench review"})
+
+async def upload_signature(c: Client, f: Fixture, rng: random.Random) -> None:
+    await c.call("POST /api/upload/signature", "POST", "/api/upload/signature", token=rng.choice(f.creator_tokens))
+
+Scenario = Callable[[Client, Fixture, random.Random], Awaitable[None]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "browse": browse,
+    "search": search,
+    "login": login,
+    "dashboard": dashboard,
+    "order_checkout_webhook": order_checkout_webhook,
+    "review": review,
+    "upload_signature": upload_signature,
+}
+
+DEFAULT_MIX = {
+    "browse": 50,
+    "search": 20,
+    "login": 5,
+    "dashboard": 10,
+    "order_checkout_webhook": 8,
+    "review": 5,
+    "upload_signature": 2,
+}
@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Tuple
+import random
+
+from creator_stats import rebuild_creator_stats
+from ratings import reconcile_ratings
+
+from ..common import CATEGORIES, PLATFORMS, WORDS
+
+SEARCH_TERMS = ["color grading", "thumbnail", "podcast mastering", "gaming intro", "subtitles", "logo"]
+ORDER_STATUSES = ["pending_payment", "paid", "in_progress", "submitted", "completed", "completed", "completed"]
+
+@dataclass
+class Fixture:
+    client_tokens: List[str] = field(default_factory=list)
+    creator_tokens: List[str] = field(default_factory=list)
+    client_names: List[str] = field(default_factory=list)
+    service_ids: List[str] = field(default_factory=list)
+    # (client token, order_id) for completed orders that have no review yet
+    reviewable: List[Tuple[str, str]] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+def as_doc(model) -> Dict[str, Any]:
+    """Store a model the way the routes do."""
+    return model.model_dump()
+
+async def insert_batched(collection, docs: List[Dict[str, Any]], size: int = 5000) -> None:
+    for i in range(0, len(docs), size):
+        await collection.insert_many(docs[i:i + size], ordered=False)
+
+async def seed(server, scale: float, rng: random.Random) -> Fixture:
+    db = server.db
+    for name in ("users", "user_sessions", "services", "orders", "reviews", "payment_transactions", "stripe_events",
+                 "catalog_summary", "creator_stats"):
+        await db[name].drop()
+    await server.ensure_indexes(db)
+
+    fixture = Fixture()
+    now = datetime.now(timezone.utc)
+    n_creators = max(5, int(50 * scale))
+    n_clients = max(10, int(500 * scale))
+    n_services = max(20, int(2000 * scale))
+    n_orders = max(50, int(10000 * scale))
+
+    users, sessions = [], []
+    creators, clients = [], []
+    for kind, count, bucket in (("creator", n_creators, creators), ("client", n_clients, clients)):
+        for i in range(count):
+            name = f"{kind}{i}"
+            user = server.User(user_id=f"user_{kind[:2]}{i:08d}", email=f"{name}@bench.local", name=name, user_type=kind)
+            token = f"session_bench_{user.user_id}"
+            users.append(as_doc(user))
+            sessions.append(as_doc(server.UserSession(user_id=user.user_id, session_token=token, expires_at=now + timedelta(days=7))))
+            bucket.append((user.user_id, token))
+            if kind == "client":
+                fixture.client_names.append(name)
+    fixture.creator_tokens = [token for _, token in creators]
+    fixture.client_tokens = [token for _, token in clients]
+    await insert_batched(db.users, users)
+    await insert_batched(db.user_sessions, sessions)
+
+    services = []
+    for i in range(n_services):
+        base_price = rng.choice([15, 25, 40, 60, 90])
+        tiers = [
+            server.ServiceTier(name=tier, description=f"{tier} package", price=base_price * mult,
+                               delivery_days=days, revisions=revs, features=rng.sample(WORDS, 3))
+            for tier, mult, days, revs in (("Starter", 1, 5, 1), ("Standard", 2, 3, 2), ("Premium", 4, 2, 5))
+        ]
+        service = server.Service(
+            service_id=f"svc_{i:012d}",
+            creator_id=rng.choice(creators)[0],
+            title=" ".join(rng.sample(WORDS, 4)),
+            description=" ".join(rng.choices(WORDS, k=40)),
+            category=rng.choice(CATEGORIES),
+            platform=rng.choice(PLATFORMS),
+            tiers=tiers,
+            portfolio_urls=[f"https://res.cloudinary.com/demo/{i}_{j}.jpg" for j in range(4)],
+            thumbnail_url=f"https://res.cloudinary.com/demo/{i}.jpg",
+            min_price=base_price,
+            created_at=now - timedelta(minutes=i),
+        )
+        services.append(as_doc(service))
+    fixture.service_ids = [s["service_id"] for s in services]
+    await insert_batched(db.services, services)
+
+    orders, reviews = [], []
+    token_by_client = dict(clients)
+    for i in range(n_orders):
+        service = rng.choice(services)
+        tier = rng.choice(service["tiers"])
+        client_id = rng.choice(clients)[0]
+        order = server.Order(
+            order_id=f"ord_{i:012d}", service_id=service["service_id"], creator_id=service["creator_id"],
+            client_id=client_id, tier_name=tier["name"], price=tier["price"], status=rng.choice(ORDER_STATUSES),
+            requirements="bench", max_revisions=tier["revisions"], created_at=now - timedelta(minutes=i),
+        )
+        orders.append(as_doc(order))
+        if order.status == "completed":
+            if rng.random() < 0.6:
+                review = server.Review(service_id=order.service_id, order_id=order.order_id, client_id=client_id,
+                                       rating=rng.randint(3, 5), comment="great work")
+                reviews.append(as_doc(review))
+            else:
+                fixture.reviewable.append((token_by_client[client_id], order.order_id))
+    await insert_batched(db.orders, orders)
+    await insert_batched(db.reviews, reviews)
+
+    await reconcile_ratings(db)
+    await rebuild_creator_stats(db)
+
+    rng.shuffle(fixture.reviewable)
+    fixture.counts = {
+        "users": len(users), "services": len(services), "orders": len(orders), "reviews": len(reviews),
+    }
+    return fixture
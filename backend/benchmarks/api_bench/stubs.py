@@ -0,0 +1,61 @@
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+async def start_auth_stub() -> asyncio.AbstractServer:
+    """HTTP/1.1 keep-alive stand-in for the Emergent session-data endpoint.
+
+    The X-Session-ID value becomes the user's identity, so a scenario can log
+    in as a seeded user by sending its email's local part.
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+                session_id = "anonymous"
+                for line in head.split("\r\n"):
+                    name, _, value = line.partition(":")
+                    if name.lower() == "x-session-id":
+                        session_id = value.strip()
+                body = json.dumps({
+                    "email": f"{session_id}@bench.local",
+                    "name": session_id,
+                    "picture": None,
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+class StubCheckout:
+    """Stands in for emergentintegrations' StripeCheckout; every session is paid."""
+
+    async def create_checkout_session(self, request):
+        session_id = f"cs_bench_{uuid.uuid4().hex[:16]}"
+        return SimpleNamespace(session_id=session_id, url=f"https://checkout.invalid/{session_id}")
+
+    async def get_checkout_status(self, session_id: str):
+        return SimpleNamespace(status="complete", payment_status="paid", amount_total=0, currency="usd", metadata={})
+
+    async def handle_webhook(self, body: bytes, signature: str):
+        event = json.loads(body)
+        return SimpleNamespace(
+            event_id=event["id"],
+            event_type=event["type"],
+            session_id=event["session_id"],
+            payment_status=event["payment_status"],
+            metadata=event["metadata"],
+        )
+
+def install(server, auth_url: str) -> None:
+    server.outbound.auth_url = auth_url
+    checkout = StubCheckout()
+    server.outbound.stripe = lambda webhook_url="": checkout
@@ -0,0 +1,34 @@
+"""Shared by every benchmark: the synthetic catalog vocabulary and one way of
+summarizing latency samples, so numbers are comparable across scripts.
+
+Standalone scripts put backend/ on sys.path and import `benchmarks.common`;
+api_bench imports it relatively.
+"""
+from typing import Dict, List
+import math
+
+CATEGORIES = ["video_editing", "graphic_design", "thumbnails", "audio_enhancement", "video_creation"]
+PLATFORMS = ["youtube", "instagram", "tiktok", "ads", "podcast", "general"]
+WORDS = (
+    "cinematic edit reel shorts color grading motion graphics podcast mixing mastering "
+    "thumbnail design logo branding intro outro subtitles captions animation vlog gaming "
+    "music ad campaign product launch story highlight transitions voiceover cleanup"
+).split()
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+def latency_summary(samples_ms: List[float]) -> Dict[str, float]:
+    samples = sorted(samples_ms)
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else 0.0,
+        "max_ms": round(samples[-1], 3) if samples else 0.0,
+    }
@@ -0,0 +1,83 @@
+"""Login latency against a local stub of the auth backend: per-request client vs pooled client.
+
+The stub speaks HTTP/1.1 with keep-alive and sleeps --handshake-ms on every
+new connection to stand in for the TCP+TLS setup a real remote host costs.
+
+    python benchmarks/login_benchmark.py --requests 500 --concurrency 20 --handshake-ms 30
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from clients import OutboundClients  # noqa: E402
+from benchmarks.common import latency_summary  # noqa: E402
+
+BODY = json.dumps({"email": "bench@example.com", "name": "Bench", "picture": None}).encode()
+
+async def start_stub(handshake_ms: float) -> asyncio.AbstractServer:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await asyncio.sleep(handshake_ms / 1000)
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(BODY)}\r\n\r\n".encode() + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+async def run(call, requests: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one() -> None:
+        async with sem:
+            start = time.perf_counter()
+            await call()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latency_summary(samples)
+
+async def main(args: argparse.Namespace) -> None:
+    server = await start_stub(args.handshake_ms)
+    port = server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/auth/v1/env/oauth/session-data"
+
+    async def per_request_client() -> None:
+        # the pre-lifespan create_session pattern
+        async with httpx.AsyncClient() as client:
+            resp = await client.get(url, headers={"X-Session-ID": "bench"})
+            resp.raise_for_status()
+            resp.json()
+
+    outbound = OutboundClients(auth_url=url, max_keepalive_connections=args.concurrency)
+    await outbound.start()
+
+    results = {
+        "before_per_request_client": await run(per_request_client, args.requests, args.concurrency),
+        "after_pooled_client": await run(lambda: outbound.fetch_session_data("bench"), args.requests, args.concurrency),
+    }
+    await outbound.close()
+    server.close()
+    await server.wait_closed()
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--handshake-ms", type=float, default=30.0)
+    asyncio.run(main(parser.parse_args()))
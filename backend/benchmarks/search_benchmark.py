@@ -0,0 +1,91 @@
+"""Compare the old unanchored $regex search with the $text search used by list_services.
+
+Seeds a synthetic catalog into a scratch database on a local mongod, then
+times both query forms for a set of search terms.
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/search_benchmark.py --services 100000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from db_indexes import INDEXES  # noqa: E402
+from benchmarks.common import CATEGORIES, PLATFORMS, WORDS, latency_summary  # noqa: E402
+
+TERMS = ["color grading", "thumbnail", "podcast mastering", "gaming intro", "subtitles"]
+
+def seed(db, count: int) -> None:
+    db.services.drop()
+    rng = random.Random(42)
+    batch = []
+    for i in range(count):
+        batch.append({
+            "service_id": f"svc_{i:012d}",
+            "creator_id": f"user_{rng.randrange(count // 20 or 1):012d}",
+            "title": " ".join(rng.sample(WORDS, 4)),
+            "description": " ".join(rng.choices(WORDS, k=40)),
+            "category": rng.choice(CATEGORIES),
+            "platform": rng.choice(PLATFORMS),
+            "tiers": [],
+            "rating": round(rng.uniform(0, 5), 1),
+            "review_count": rng.randrange(200),
+            "status": "active" if rng.random() < 0.9 else "paused",
+        })
+        if len(batch) == 5000:
+            db.services.insert_many(batch)
+            batch = []
+    if batch:
+        db.services.insert_many(batch)
+    db.services.create_indexes(INDEXES["services"])
+
+def time_query(fn, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return latency_summary(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("BENCH_DB_NAME", "search_benchmark")]
+    if not args.skip_seed:
+        seed(db, args.services)
+
+    results = []
+    for term in TERMS:
+        base = {"status": "active", "category": "video_editing"}
+        regex_query = dict(base, **{"$or": [
+            {"title": {"$regex": term, "$options": "i"}},
+            {"description": {"$regex": term, "$options": "i"}},
+        ]})
+        text_query = dict(base, **{"$text": {"$search": term}})
+        score = {"$meta": "textScore"}
+
+        results.append({
+            "term": term,
+            "regex": time_query(lambda: list(db.services.find(regex_query, {"_id": 0}).limit(20)), args.runs),
+            "text": time_query(
+                lambda: list(db.services.find(text_query, {"_id": 0, "score": score}).sort([("score", score)]).limit(20)),
+                args.runs,
+            ),
+        })
+
+    print(json.dumps({"services": db.services.estimated_document_count(), "results": results}, indent=2))
+    client.close()
+
+if __name__ == "__main__":
+    main()
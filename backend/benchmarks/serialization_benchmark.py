@@ -0,0 +1,115 @@
+"""CPU per request for a /api/services page: jsonable_encoder + json vs orjson, and ETag/304/compression.
+
+Serves the same synthetic page from two FastAPI apps over an in-process ASGI
+transport (no MongoDB needed) and reports process CPU time per request:
+
+  before  dict return, ISO-string dates, default JSONResponse
+  after   ORJSONResponse returned directly, datetime values, ETagCompressionMiddleware
+
+    python benchmarks/serialization_benchmark.py --requests 2000 --page-size 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from http_caching import ETagCompressionMiddleware  # noqa: E402
+from benchmarks.common import WORDS  # noqa: E402
+
+def make_page(size: int, rng: random.Random) -> list:
+    now = datetime.now(timezone.utc)
+    page = []
+    for i in range(size):
+        base = rng.choice([15, 25, 40, 60, 90])
+        page.append({
+            "service_id": f"svc_{i:012d}",
+            "creator_id": f"user_{rng.randrange(500):012d}",
+            "title": " ".join(rng.sample(WORDS, 4)),
+            "description": " ".join(rng.choices(WORDS, k=40)),
+            "category": "video_editing",
+            "platform": "youtube",
+            "tiers": [
+                {"name": name, "description": f"{name} package", "price": base * mult, "delivery_days": 3,
+                 "revisions": 2, "features": rng.sample(WORDS, 3)}
+                for name, mult in (("Starter", 1), ("Standard", 2), ("Premium", 4))
+            ],
+            "portfolio_urls": [f"https://res.cloudinary.com/demo/{i}_{j}.jpg" for j in range(4)],
+            "thumbnail_url": f"https://res.cloudinary.com/demo/{i}.jpg",
+            "min_price": float(base),
+            "rating": round(rng.uniform(3, 5), 2),
+            "rating_sum": 0.0,
+            "review_count": rng.randrange(200),
+            "status": "active",
+            "created_at": now - timedelta(minutes=i),
+        })
+    return page
+
+def build_apps(page: list):
+    string_page = [{**doc, "created_at": doc["created_at"].isoformat()} for doc in page]
+
+    before = FastAPI(default_response_class=JSONResponse)
+
+    @before.get("/api/services")
+    async def before_list():
+        return {"services": string_page, "total": None, "next_cursor": None}
+
+    after = FastAPI(default_response_class=ORJSONResponse)
+
+    @after.get("/api/services")
+    async def after_list():
+        return ORJSONResponse({"services": page, "total": None, "next_cursor": None})
+
+    after.add_middleware(ETagCompressionMiddleware, path_prefixes=("/api/services",))
+    return before, after
+
+async def measure(app, requests: int, headers: dict = None, etag_from_first: bool = False) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = dict(headers or {})
+        first = await client.get("/api/services", headers=headers)
+        if etag_from_first:
+            headers["If-None-Match"] = first.headers["etag"]
+        status = None
+        wire_bytes = 0
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for _ in range(requests):
+            resp = await client.get("/api/services", headers=headers)
+            status = resp.status_code
+            wire_bytes = len(resp.content) if resp.headers.get("content-encoding") is None else int(resp.headers["content-length"])
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return {
+        "status": status,
+        "bytes_on_wire": wire_bytes,
+        "cpu_us_per_request": round(cpu / requests * 1e6, 1),
+        "wall_us_per_request": round(wall / requests * 1e6, 1),
+    }
+
+async def main(args: argparse.Namespace) -> None:
+    page = make_page(args.page_size, random.Random(42))
+    before, after = build_apps(page)
+    results = {
+        "before_jsonable_encoder": await measure(before, args.requests, {"Accept-Encoding": "identity"}),
+        "after_orjson": await measure(after, args.requests, {"Accept-Encoding": "identity"}),
+        "after_orjson_gzip": await measure(after, args.requests, {"Accept-Encoding": "gzip"}),
+        "after_orjson_br": await measure(after, args.requests, {"Accept-Encoding": "br"}),
+        "after_304_revalidation": await measure(after, args.requests, etag_from_first=True),
+    }
+    base = results["before_jsonable_encoder"]["cpu_us_per_request"]
+    for row in results.values():
+        row["cpu_saved_pct"] = round((base - row["cpu_us_per_request"]) / base * 100, 1) if base else None
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,129 @@
+"""Trending feed: background refresh cost vs. scoring on every request.
+
+Seeds a synthetic catalog and a large paid-order history into a scratch
+database on a local mongod, then reports:
+
+  refresh      one refresh_trending() run (what the lifespan task does every interval)
+  feed_read    a page from trending_services, first page and a deep keyset page
+  on_demand    the same ranking computed per request: demand aggregation over
+               orders + scoring every active service, as a "popular" sort would
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/trending_benchmark.py --services 20000 --orders 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from db_indexes import INDEXES  # noqa: E402
+from trending import TrendingWeights, demand_pipeline, catalog_mean_rating, refresh_trending, score_service  # noqa: E402
+from benchmarks.common import CATEGORIES, PLATFORMS, latency_summary  # noqa: E402
+
+CARD_PROJECTION = {
+    "_id": 0, "service_id": 1, "creator_id": 1, "title": 1, "category": 1, "platform": 1,
+    "thumbnail_url": 1, "min_price": 1, "rating": 1, "review_count": 1, "created_at": 1,
+}
+
+async def seed(db, n_services: int, n_orders: int, rng: random.Random) -> None:
+    for name in ("services", "orders", "trending_services"):
+        await db[name].drop()
+    now = datetime.now(timezone.utc)
+    services = []
+    for i in range(n_services):
+        reviews = rng.randrange(0, 80)
+        rating = round(rng.uniform(2.5, 5), 2) if reviews else 0.0
+        services.append({
+            "service_id": f"svc_{i:012d}", "creator_id": f"user_{i % 500:012d}", "title": f"Service {i}",
+            "category": rng.choice(CATEGORIES), "platform": rng.choice(PLATFORMS), "status": "active",
+            "thumbnail_url": f"https://res.cloudinary.com/demo/{i}.jpg", "min_price": rng.choice([15, 25, 40, 60, 90]),
+            "rating": rating, "rating_sum": rating * reviews, "review_count": reviews,
+            "created_at": now - timedelta(days=rng.uniform(0, 365)),
+        })
+    await db.services.insert_many(services)
+    await db.services.create_indexes(INDEXES["services"])
+
+    # popularity follows a power law, as real order histories do
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(n_services)]
+    batch = []
+    for i in range(n_orders):
+        created = now - timedelta(days=rng.uniform(0, 180))
+        batch.append({
+            "order_id": f"ord_{i:012d}", "service_id": f"svc_{rng.choices(range(n_services), weights)[0]:012d}",
+            "status": rng.choice(["completed", "completed", "paid", "in_progress", "cancelled", "pending_payment"]),
+            "price": 40.0, "created_at": created, "paid_at": created + timedelta(minutes=5),
+        })
+        if len(batch) == 10000:
+            await db.orders.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.orders.insert_many(batch, ordered=False)
+    await db.orders.create_indexes(INDEXES["orders"])
+
+async def timed(fn, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return latency_summary(samples)
+
+async def main(args: argparse.Namespace) -> None:
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), tz_aware=True)
+    db = client[os.environ.get("BENCH_DB_NAME", "trending_benchmark")]
+    weights = TrendingWeights()
+    if not args.skip_seed:
+        started = time.perf_counter()
+        await seed(db, args.services, args.orders, random.Random(11))
+        print(f"seeded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    started = time.perf_counter()
+    report = await refresh_trending(db, CARD_PROJECTION, weights)
+    refresh_ms = (time.perf_counter() - started) * 1000
+
+    sort = [("score", -1), ("service_id", -1)]
+
+    async def first_page():
+        await db.trending_services.find({"feed": "category:thumbnails"}, {"_id": 0, "feed": 0}).sort(sort).limit(20).to_list(20)
+
+    deep = await db.trending_services.find({"feed": "all"}).sort(sort).skip(2000).limit(1).to_list(1)
+
+    async def deep_page():
+        after = {"$or": [{"score": {"$lt": deep[0]["score"]}},
+                         {"score": deep[0]["score"], "service_id": {"$lt": deep[0]["service_id"]}}]}
+        await db.trending_services.find({"feed": "all", **after}, {"_id": 0, "feed": 0}).sort(sort).limit(20).to_list(20)
+
+    async def on_demand():
+        now = datetime.now(timezone.utc)
+        demand = {row["_id"]: row["demand"] async for row in db.orders.aggregate(demand_pipeline(now, weights))}
+        prior = await catalog_mean_rating(db)
+        scored = [
+            (score_service(s, demand.get(s["service_id"], 0.0), prior, weights, now), s)
+            async for s in db.services.find({"status": "active", "category": "thumbnails"}, {**CARD_PROJECTION, "rating_sum": 1})
+        ]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:20]
+
+    results = {
+        "refresh": {"ms": round(refresh_ms, 1), **{k: v for k, v in report.items() if k != "refreshed_at"}},
+        "feed_read_first_page": await timed(first_page, args.runs),
+        "feed_read_deep_page": await timed(deep_page, args.runs) if deep else None,
+        "on_demand_per_request": await timed(on_demand, max(3, args.runs // 10)),
+    }
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+    client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--skip-seed", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""Fire duplicate and out-of-order Stripe webhook events at the app and check the outcome.
+
+Runs server.app in-process (httpx ASGITransport) against a scratch database on a
+local mongod, with StripeCheckout replaced by a stand-in that accepts unsigned
+JSON. Reports ack latency, queue drain time and whether every order ended up
+paid exactly once.
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/webhook_load.py --orders 2000 --duplicates 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = os.environ.get("BENCH_DB_NAME", "webhook_load")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import server  # noqa: E402
+from benchmarks.common import latency_summary  # noqa: E402
+
+class StandInCheckout:
+    async def handle_webhook(self, body: bytes, signature: str):
+        event = json.loads(body)
+        return SimpleNamespace(
+            event_id=event["id"],
+            event_type=event["type"],
+            session_id=event["session_id"],
+            payment_status=event["payment_status"],
+            metadata=event["metadata"],
+        )
+
+def build_events(orders: int, duplicates: int, rng: random.Random) -> list:
+    events = []
+    for i in range(orders):
+        base = {"session_id": f"cs_{i}", "metadata": {"order_id": f"ord_{i}"}}
+        paid = {"id": f"evt_paid_{i}", "type": "checkout.session.completed", "payment_status": "paid", **base}
+        # an earlier "unpaid" event that arrives late must not undo the payment
+        stale = {"id": f"evt_open_{i}", "type": "checkout.session.async_payment_pending", "payment_status": "unpaid", **base}
+        events.extend([paid] * (1 + duplicates))
+        events.append(stale)
+    rng.shuffle(events)
+    return events
+
+async def seed(db, orders: int) -> None:
+    for name in ("orders", "payment_transactions", "stripe_events"):
+        await db[name].drop()
+    await db.orders.insert_many([
+        {"order_id": f"ord_{i}", "client_id": "user_load", "creator_id": "user_creator",
+         "status": "pending_payment", "price": 10.0, "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+        for i in range(orders)
+    ])
+    await db.payment_transactions.insert_many([
+        {"payment_id": f"pay_{i}", "order_id": f"ord_{i}", "session_id": f"cs_{i}",
+         "amount": 10.0, "payment_status": "initiated", "user_id": "user_load"}
+        for i in range(orders)
+    ])
+
+async def main(args: argparse.Namespace) -> None:
+    rng = random.Random(7)
+    server.outbound.stripe = lambda webhook_url="": StandInCheckout()
+    server.mongo.open()  # seed before startup; the lifespan handler reuses this client
+    db = server.db
+    await seed(db, args.orders)
+    events = build_events(args.orders, args.duplicates, rng)
+
+    async with server.lifespan(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            sem = asyncio.Semaphore(args.concurrency)
+            latencies, statuses = [], {}
+
+            async def fire(event: dict) -> None:
+                async with sem:
+                    start = time.perf_counter()
+                    resp = await http.post("/api/webhook/stripe", content=json.dumps(event),
+                                           headers={"Stripe-Signature": "stand-in"})
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(fire(e) for e in events))
+            ack_seconds = time.perf_counter() - started
+
+            while True:
+                counts = await server.webhook_queue.stats()
+                if counts["pending"] == 0 and counts["processing"] == 0:
+                    break
+                await asyncio.sleep(0.05)
+            drain_seconds = time.perf_counter() - started
+
+        # before the lifespan exit closes the Motor client
+        paid = await db.orders.count_documents({"status": "paid"})
+        completed = await db.payment_transactions.count_documents({"payment_status": "completed"})
+        stored = await db.stripe_events.count_documents({})
+
+    print(json.dumps({
+        "config": vars(args),
+        "events_sent": len(events),
+        "http_status": statuses,
+        "ack_throughput_rps": round(len(events) / ack_seconds, 1),
+        "ack_latency": latency_summary(latencies),
+        "drain_seconds": round(drain_seconds, 2),
+        "unique_events_stored": stored,
+        "orders_paid": paid,
+        "payments_completed": completed,
+        "consistent": paid == args.orders and completed == args.orders and stored == args.orders * 2,
+    }, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--duplicates", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
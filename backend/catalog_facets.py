@@ -0,0 +1,129 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Any, Dict, List, Optional, Tuple
+
+# Facet counts for the active catalog. Filtered requests get theirs from the
+# same $facet aggregation as the page; the unfiltered catalog reads a summary
+# document that create_service/update_service keep current with $inc, and
+# that a scheduled repair (repair_catalog_summary) recounts and corrects.
+
+FACET_FIELDS = ("category", "platform")
+SUMMARY_ID = "active_services"
+DRIFT_ID = "active_services_drift"  # drift seen by the last scheduled repair, as [path, delta] pairs
+
+def _countable(value: Any) -> bool:
+    # values become field paths in the summary document
+    return isinstance(value, str) and value != "" and "." not in value and not value.startswith("$")
+
+def facet_pipeline(query: Dict[str, Any], result_stages: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """One aggregation returning the page as `results` plus a count per facet value."""
+    facets: Dict[str, Any] = {"total": [{"$count": "n"}]}
+    if result_stages is not None:
+        facets["results"] = result_stages
+    for name in FACET_FIELDS:
+        facets[name] = [{"$group": {"_id": f"${name}", "count": {"$sum": 1}}}, {"$sort": {"count": -1, "_id": 1}}]
+    return [{"$match": query}, {"$facet": facets}]
+
+def format_facets(row: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    return {
+        name: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in row.get(name, []) if bucket["_id"] is not None]
+        for name in FACET_FIELDS
+    }
+
+def _summary_to_facets(summary: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    facets = {}
+    for name in FACET_FIELDS:
+        counts = [(value, count) for value, count in (summary.get(name) or {}).items() if count > 0]
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        facets[name] = [{"value": value, "count": count} for value, count in counts]
+    return facets
+
+async def get_catalog_summary(db: AsyncIOMotorDatabase) -> Optional[Dict[str, Any]]:
+    summary = await db.catalog_summary.find_one({"_id": SUMMARY_ID})
+    if not summary:
+        return None
+    return {"total": summary.get("total", 0), "facets": _summary_to_facets(summary)}
+
+def summary_drift(stored: Optional[Dict[str, Any]], rebuilt: Dict[str, Any]) -> Dict[str, int]:
+    """Stored minus recomputed count for every path that disagrees."""
+    stored = stored or {}
+    drift: Dict[str, int] = {}
+    if stored.get("total", 0) != rebuilt["total"]:
+        drift["total"] = stored.get("total", 0) - rebuilt["total"]
+    for name in FACET_FIELDS:
+        old, new = stored.get(name) or {}, rebuilt[name]
+        for value in set(old) | set(new):
+            delta = old.get(value, 0) - new.get(value, 0)
+            if delta:
+                drift[f"{name}.{value}"] = delta
+    return drift
+
+async def recount_catalog_summary(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    rows = await db.services.aggregate(facet_pipeline({"status": "active"}), allowDiskUse=True).to_list(length=1)
+    row = rows[0] if rows else {}
+    doc: Dict[str, Any] = {"total": row["total"][0]["n"] if row.get("total") else 0}
+    for name in FACET_FIELDS:
+        doc[name] = {b["_id"]: b["count"] for b in row.get(name, []) if _countable(b["_id"])}
+    return doc
+
+async def rebuild_catalog_summary(db: AsyncIOMotorDatabase, apply: bool = True,
+                                  confirm: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Recount the summary from services and correct the drift found.
+
+    Corrections are relative ($inc by minus the drift), so increments from
+    concurrent writes are kept. With `confirm`, only paths whose drift matches
+    it are corrected.
+    """
+    doc = await recount_catalog_summary(db)
+    stored = await db.catalog_summary.find_one({"_id": SUMMARY_ID})
+    drift = summary_drift(stored, doc)
+    corrected = drift if confirm is None else {path: delta for path, delta in drift.items() if confirm.get(path) == delta}
+    if apply and stored is None:
+        await db.catalog_summary.replace_one({"_id": SUMMARY_ID}, doc, upsert=True)
+    elif apply and corrected:
+        await db.catalog_summary.update_one({"_id": SUMMARY_ID}, {"$inc": {path: -delta for path, delta in corrected.items()}})
+    return {
+        "total": doc["total"], "missing": stored is None, "drift": drift,
+        "corrected": corrected if apply else {}, "applied": apply and (stored is None or bool(corrected)),
+    }
+
+async def repair_catalog_summary(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Scheduled repair: corrects only drift an earlier run also saw.
+
+    A service write and its summary $inc are separate operations, so a single
+    recount can catch one in flight; real drift persists across runs.
+    """
+    pending = await db.catalog_summary.find_one({"_id": DRIFT_ID})
+    previous = {path: delta for path, delta in (pending or {}).get("drift", [])}
+    report = await rebuild_catalog_summary(db, confirm=previous)
+    unconfirmed = [[path, delta] for path, delta in report["drift"].items() if path not in report["corrected"]]
+    await db.catalog_summary.replace_one({"_id": DRIFT_ID}, {"drift": unconfirmed}, upsert=True)
+    return report
+
+async def ensure_catalog_summary(db: AsyncIOMotorDatabase) -> None:
+    if not await db.catalog_summary.find_one({"_id": SUMMARY_ID}, {"_id": 1}):
+        await rebuild_catalog_summary(db)
+
+async def apply_service_change(db: AsyncIOMotorDatabase, old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> None:
+    """Adjust the summary for a created (old=None) or updated service."""
+    await apply_service_changes(db, [(old, new)])
+
+async def apply_service_changes(db: AsyncIOMotorDatabase, changes: List[Tuple[Optional[Dict[str, Any]], Dict[str, Any]]]) -> None:
+    """Fold any number of (old, new) pairs into a single $inc on the summary."""
+    inc: Dict[str, int] = {}
+
+    def count(doc: Dict[str, Any], delta: int) -> None:
+        if doc.get("status") != "active":
+            return
+        inc["total"] = inc.get("total", 0) + delta
+        for name in FACET_FIELDS:
+            if _countable(doc.get(name)):
+                path = f"{name}.{doc[name]}"
+                inc[path] = inc.get(path, 0) + delta
+
+    for old, new in changes:
+        if old:
+            count(old, -1)
+        count(new, 1)
+    inc = {path: delta for path, delta in inc.items() if delta}
+    if inc:
+        await db.catalog_summary.update_one({"_id": SUMMARY_ID}, {"$inc": inc}, upsert=True)
@@ -0,0 +1,132 @@
+from emergentintegrations.payments.stripe.checkout import StripeCheckout
+from metrics import observe_outbound
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import asyncio
+import functools
+import logging
+import os
+import time
+import httpx
+
+logger = logging.getLogger(__name__)
+
+EMERGENT_AUTH_URL = "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data"
+
+RETRYABLE_STATUS = {502, 503, 504}
+
+class TimedCheckout:
+    """Wraps a StripeCheckout so each call is recorded as outbound time."""
+
+    def __init__(self, checkout: StripeCheckout):
+        self._checkout = checkout
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._checkout, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = await attr(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                observe_outbound(f"stripe.{name}", time.perf_counter() - start, ok)
+        return timed
+
+class OutboundClients:
+    """Shared outbound HTTP and Stripe clients, opened and closed by the app lifespan.
+
+    One pooled httpx.AsyncClient is reused for every call to the auth backend so
+    logins reuse warm keep-alive connections instead of a new TCP+TLS handshake.
+    StripeCheckout instances are memoized per webhook URL.
+    """
+
+    def __init__(
+        self,
+        auth_url: str = EMERGENT_AUTH_URL,
+        stripe_api_key: Optional[str] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+    ):
+        self.auth_url = auth_url
+        self.stripe_api_key = stripe_api_key
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.http: Optional[httpx.AsyncClient] = None
+        self._stripe: Dict[str, TimedCheckout] = {}
+
+    @classmethod
+    def from_env(cls) -> "OutboundClients":
+        return cls(
+            auth_url=os.getenv('EMERGENT_AUTH_URL', EMERGENT_AUTH_URL),
+            stripe_api_key=os.getenv('STRIPE_API_KEY'),
+            max_connections=int(os.getenv('HTTP_MAX_CONNECTIONS', '100')),
+            max_keepalive_connections=int(os.getenv('HTTP_MAX_KEEPALIVE', '20')),
+            keepalive_expiry=float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30')),
+            timeout=float(os.getenv('HTTP_TIMEOUT', '10')),
+            connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+            retries=int(os.getenv('HTTP_RETRIES', '2')),
+            backoff=float(os.getenv('HTTP_BACKOFF', '0.2')),
+        )
+
+    async def start(self) -> None:
+        # request() is the only retry layer (connect errors, timeouts, 5xx), with backoff
+        transport = httpx.AsyncHTTPTransport(limits=self.limits)
+        self.http = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+
+    async def close(self) -> None:
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
+        self._stripe.clear()
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request, retrying transient failures with exponential backoff."""
+        if self.http is None:
+            raise RuntimeError("OutboundClients used before start()")
+        target = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                resp = await self.http.request(method, url, **kwargs)
+                observe_outbound(target, time.perf_counter() - start, resp.status_code < 500)
+                if resp.status_code not in RETRYABLE_STATUS or attempt == self.retries:
+                    return resp
+            except (httpx.TimeoutException, httpx.NetworkError):
+                observe_outbound(target, time.perf_counter() - start, False)
+                if attempt == self.retries:
+                    raise
+            delay = self.backoff * (2 ** attempt)
+            logger.warning(f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+
+    async def fetch_session_data(self, session_id: str) -> Dict[str, Any]:
+        resp = await self.request("GET", self.auth_url, headers={"X-Session-ID": session_id})
+        resp.raise_for_status()
+        return resp.json()
+
+    def stripe(self, webhook_url: str = "") -> TimedCheckout:
+        checkout = self._stripe.get(webhook_url)
+        if checkout is None:
+            if len(self._stripe) >= 32:
+                # webhook_url follows the request Host; don't let it grow unbounded
+                self._stripe.clear()
+            checkout = TimedCheckout(StripeCheckout(api_key=self.stripe_api_key, webhook_url=webhook_url))
+            self._stripe[webhook_url] = checkout
+        return checkout
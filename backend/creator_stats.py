@@ -0,0 +1,185 @@
+from datetime import datetime, timezone
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne, UpdateOne
+from typing import Any, Dict, Iterable, List, Optional
+
+# One creator_stats document per creator (_id = creator_id), kept current with
+# $inc as orders move through order_state and reviews arrive, so the dashboard
+# reads a single document. rebuild_creator_stats recomputes every document from
+# orders and reviews when the counters are suspected to have drifted.
+
+# Statuses an order holds once paid for; revenue and paid_orders count these
+PAID_STATES = ("paid", "in_progress", "submitted", "revision_requested", "completed")
+
+def _turnaround_seconds(order: Dict[str, Any]) -> Optional[float]:
+    started = order.get("paid_at") or order.get("created_at")
+    finished = order.get("completed_at")
+    if isinstance(started, datetime) and isinstance(finished, datetime):
+        if started.tzinfo is None:
+            started = started.replace(tzinfo=timezone.utc)
+        if finished.tzinfo is None:
+            finished = finished.replace(tzinfo=timezone.utc)
+        return (finished - started).total_seconds()
+    return None
+
+def transition_inc(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, float]:
+    """Counter deltas for one order moving from before["status"] to after["status"]."""
+    old, new = before["status"], after["status"]
+    inc: Dict[str, float] = {f"by_status.{old}": -1, f"by_status.{new}": 1}
+    price = after.get("price", 0)
+    if new in PAID_STATES and old not in PAID_STATES:
+        inc.update({"paid_orders": 1, "revenue": price})
+    elif old in PAID_STATES and new not in PAID_STATES:
+        inc.update({"paid_orders": -1, "revenue": -price})
+    if new == "revision_requested":
+        inc["revision_requests"] = 1
+    if new == "completed":
+        inc.update({
+            "completed": 1,
+            "revisions_used_sum": after.get("revision_count", 0),
+            "revisions_allowed_sum": after.get("max_revisions", 0),
+        })
+        turnaround = _turnaround_seconds(after)
+        if turnaround is not None:
+            inc.update({"turnaround_count": 1, "turnaround_seconds_sum": turnaround})
+    return inc
+
+def _update(inc: Dict[str, float]) -> Dict[str, Any]:
+    return {"$inc": inc, "$set": {"updated_at": datetime.now(timezone.utc)}}
+
+async def order_created(db: AsyncIOMotorDatabase, order: Dict[str, Any]) -> None:
+    await db.creator_stats.update_one(
+        {"_id": order["creator_id"]},
+        _update({"orders_total": 1, f"by_status.{order['status']}": 1}),
+        upsert=True
+    )
+
+async def order_transitioned(db: AsyncIOMotorDatabase, before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    await db.creator_stats.update_one({"_id": after["creator_id"]}, _update(transition_inc(before, after)), upsert=True)
+
+async def orders_transitioned(db: AsyncIOMotorDatabase, changes: Iterable[Dict[str, Any]], from_status: str) -> None:
+    """Bulk form for orders that all left `from_status`, one $inc per creator."""
+    per_creator: Dict[str, Dict[str, float]] = {}
+    for order in changes:
+        inc = per_creator.setdefault(order["creator_id"], {})
+        for path, delta in transition_inc({"status": from_status}, order).items():
+            inc[path] = inc.get(path, 0) + delta
+    if per_creator:
+        await db.creator_stats.bulk_write(
+            [UpdateOne({"_id": creator_id}, _update(inc), upsert=True) for creator_id, inc in per_creator.items()],
+            ordered=False
+        )
+
+async def review_added(db: AsyncIOMotorDatabase, creator_id: str, rating: float) -> None:
+    await db.creator_stats.update_one(
+        {"_id": creator_id}, _update({"review_count": 1, "rating_sum": rating}), upsert=True
+    )
+
+def format_stats(doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    doc = doc or {}
+    turnaround_count = doc.get("turnaround_count", 0)
+    completed = doc.get("completed", 0)
+    review_count = doc.get("review_count", 0)
+    return {
+        "orders_total": doc.get("orders_total", 0),
+        "orders_by_status": {status: n for status, n in (doc.get("by_status") or {}).items() if n},
+        "paid_orders": doc.get("paid_orders", 0),
+        "revenue": round(doc.get("revenue", 0), 2),
+        "completed": completed,
+        "avg_turnaround_hours": round(doc["turnaround_seconds_sum"] / turnaround_count / 3600, 2) if turnaround_count else None,
+        "revision_requests": doc.get("revision_requests", 0),
+        "avg_revisions_used": round(doc.get("revisions_used_sum", 0) / completed, 2) if completed else None,
+        "revision_allowance_used": round(doc.get("revisions_used_sum", 0) / doc["revisions_allowed_sum"], 4) if doc.get("revisions_allowed_sum") else None,
+        "review_count": review_count,
+        "avg_rating": round(doc.get("rating_sum", 0) / review_count, 2) if review_count else None,
+        "updated_at": doc.get("updated_at"),
+    }
+
+async def get_creator_stats(db: AsyncIOMotorDatabase, creator_id: str) -> Dict[str, Any]:
+    return format_stats(await db.creator_stats.find_one({"_id": creator_id}))
+
+# ==================== REBUILD ====================
+
+def _is_date(field: str) -> Dict[str, Any]:
+    return {"$eq": [{"$type": field}, "date"]}
+
+def order_stats_pipeline() -> List[Dict[str, Any]]:
+    paid = {"$in": ["$status", list(PAID_STATES)]}
+    completed = {"$eq": ["$status", "completed"]}
+    started = {"$ifNull": ["$paid_at", "$created_at"]}
+    timed = {"$and": [completed, _is_date("$completed_at"), {"$eq": [{"$type": started}, "date"]}]}
+    return [
+        {"$group": {
+            "_id": {"creator_id": "$creator_id", "status": "$status"},
+            "orders": {"$sum": 1},
+            "revenue": {"$sum": {"$cond": [paid, "$price", 0]}},
+            "paid_orders": {"$sum": {"$cond": [paid, 1, 0]}},
+            "revision_requests": {"$sum": {"$ifNull": ["$revision_count", 0]}},
+            "revisions_used_sum": {"$sum": {"$cond": [completed, {"$ifNull": ["$revision_count", 0]}, 0]}},
+            "revisions_allowed_sum": {"$sum": {"$cond": [completed, {"$ifNull": ["$max_revisions", 0]}, 0]}},
+            "turnaround_count": {"$sum": {"$cond": [timed, 1, 0]}},
+            "turnaround_ms_sum": {"$sum": {"$cond": [timed, {"$subtract": ["$completed_at", started]}, 0]}},
+        }},
+        {"$group": {
+            "_id": "$_id.creator_id",
+            "orders_total": {"$sum": "$orders"},
+            "by_status": {"$push": {"k": "$_id.status", "v": "$orders"}},
+            "revenue": {"$sum": "$revenue"},
+            "paid_orders": {"$sum": "$paid_orders"},
+            "completed": {"$sum": {"$cond": [{"$eq": ["$_id.status", "completed"]}, "$orders", 0]}},
+            "revision_requests": {"$sum": "$revision_requests"},
+            "revisions_used_sum": {"$sum": "$revisions_used_sum"},
+            "revisions_allowed_sum": {"$sum": "$revisions_allowed_sum"},
+            "turnaround_count": {"$sum": "$turnaround_count"},
+            "turnaround_ms_sum": {"$sum": "$turnaround_ms_sum"},
+        }},
+        {"$set": {
+            "by_status": {"$arrayToObject": "$by_status"},
+            "turnaround_seconds_sum": {"$divide": ["$turnaround_ms_sum", 1000]},
+        }},
+        {"$unset": "turnaround_ms_sum"},
+    ]
+
+def review_stats_pipeline() -> List[Dict[str, Any]]:
+    # reviews carry order_id, not creator_id
+    return [
+        {"$lookup": {"from": "orders", "localField": "order_id", "foreignField": "order_id", "as": "order"}},
+        {"$unwind": "$order"},
+        {"$group": {"_id": "$order.creator_id", "review_count": {"$sum": 1}, "rating_sum": {"$sum": "$rating"}}},
+    ]
+
+async def rebuild_creator_stats(db: AsyncIOMotorDatabase, apply: bool = True, batch_size: int = 500) -> Dict[str, Any]:
+    """Recompute every creator's document from orders and reviews, streaming aggregation results in batches."""
+    report = {"creators": 0, "reviewed_creators": 0, "written": 0}
+    now = datetime.now(timezone.utc)
+
+    async def flush(ops: List[Any]) -> None:
+        if apply and ops:
+            result = await db.creator_stats.bulk_write(ops, ordered=False)
+            report["written"] += result.modified_count + result.upserted_count
+
+    ops: List[Any] = []
+    async for row in db.orders.aggregate(order_stats_pipeline(), allowDiskUse=True, batchSize=batch_size):
+        creator_id = row.pop("_id")
+        if creator_id is None:
+            continue
+        report["creators"] += 1
+        ops.append(ReplaceOne({"_id": creator_id}, {**row, "review_count": 0, "rating_sum": 0, "updated_at": now}, upsert=True))
+        if len(ops) >= batch_size:
+            await flush(ops)
+            ops = []
+    await flush(ops)
+
+    ops = []
+    async for row in db.reviews.aggregate(review_stats_pipeline(), allowDiskUse=True, batchSize=batch_size):
+        report["reviewed_creators"] += 1
+        ops.append(UpdateOne(
+            {"_id": row["_id"]},
+            {"$set": {"review_count": row["review_count"], "rating_sum": row["rating_sum"], "updated_at": now}},
+            upsert=True
+        ))
+        if len(ops) >= batch_size:
+            await flush(ops)
+            ops = []
+    await flush(ops)
+    return report
@@ -0,0 +1,101 @@
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from typing import Any, Dict, List, Optional
+import os
+
+# The Motor client is built in the lifespan handler, not at import, so each
+# Gunicorn/Uvicorn worker opens its own pool after fork. Module-level code
+# holds DatabaseHandle objects that resolve to the real database once open.
+
+READ_MODES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+def read_preference(mode: str, max_staleness_seconds: int = -1):
+    """Read preference by name; max_staleness -1 means no limit (MongoDB's minimum otherwise is 90s)."""
+    if mode == "primary":
+        return Primary()
+    if mode not in READ_MODES:
+        raise ValueError(f"Unknown read preference {mode!r}")
+    return READ_MODES[mode](max_staleness=max_staleness_seconds)
+
+def client_options_from_env() -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "maxPoolSize": int(os.getenv('MONGO_MAX_POOL_SIZE', '100')),
+        "minPoolSize": int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+        "maxConnecting": int(os.getenv('MONGO_MAX_CONNECTING', '2')),
+    }
+    wait_queue_timeout_ms = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0'))
+    if wait_queue_timeout_ms > 0:
+        # raise instead of queueing indefinitely behind an exhausted pool
+        options["waitQueueTimeoutMS"] = wait_queue_timeout_ms
+    max_idle_ms = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '0'))
+    if max_idle_ms > 0:
+        options["maxIdleTimeMS"] = max_idle_ms
+    compressors = os.getenv('MONGO_COMPRESSORS', '')  # e.g. "zstd,snappy,zlib", in preference order
+    if compressors:
+        options["compressors"] = compressors
+        options["zlibCompressionLevel"] = int(os.getenv('MONGO_ZLIB_COMPRESSION_LEVEL', '-1'))
+    return options
+
+class MongoConnection:
+    def __init__(self, url: str, db_name: str, options: Optional[Dict[str, Any]] = None,
+                 event_listeners: Optional[List[monitoring.CommandListener]] = None,
+                 replica_read_preference=None):
+        self.url = url
+        self.db_name = db_name
+        self.options = options or {}
+        self.event_listeners = event_listeners or []
+        self.replica_read_preference = replica_read_preference or Primary()
+        self.client: Optional[AsyncIOMotorClient] = None
+        self._primary: Optional[AsyncIOMotorDatabase] = None
+        self._replica: Optional[AsyncIOMotorDatabase] = None
+
+    @classmethod
+    def from_env(cls, event_listeners: Optional[List[monitoring.CommandListener]] = None) -> "MongoConnection":
+        return cls(
+            os.environ['MONGO_URL'],
+            os.environ['DB_NAME'],
+            options=client_options_from_env(),
+            event_listeners=event_listeners,
+            replica_read_preference=read_preference(
+                os.getenv('CATALOG_READ_PREFERENCE', 'secondaryPreferred'),
+                int(os.getenv('CATALOG_MAX_STALENESS_SECONDS', '90'))
+            ),
+        )
+
+    def open(self) -> None:
+        if self.client is not None:
+            return
+        # tz_aware: dates are stored as BSON datetimes and compared against aware UTC now()
+        self.client = AsyncIOMotorClient(self.url, tz_aware=True, event_listeners=self.event_listeners, **self.options)
+        self._primary = self.client[self.db_name]
+        self._replica = self.client.get_database(self.db_name, read_preference=self.replica_read_preference)
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client = self._primary = self._replica = None
+
+    def database(self, replica: bool = False) -> AsyncIOMotorDatabase:
+        target = self._replica if replica else self._primary
+        if target is None:
+            raise RuntimeError("MongoDB client is not open; it is created in the lifespan handler")
+        return target
+
+class DatabaseHandle:
+    """Attribute/item access forwards to the connection's database once it is open."""
+
+    def __init__(self, connection: MongoConnection, replica: bool = False):
+        self._connection = connection
+        self._replica = replica
+
+    def __getattr__(self, name: str):
+        return getattr(self._connection.database(self._replica), name)
+
+    def __getitem__(self, name: str):
+        return self._connection.database(self._replica)[name]
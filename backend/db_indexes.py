@@ -0,0 +1,125 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ==================== INDEX REGISTRY ====================
+# One entry per collection. Every query shape issued from server.py must be
+# covered by an index listed here (see scripts/check_query_plans.py).
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "user_sessions": [
+        IndexModel([("session_token", ASCENDING)], name="session_token_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+        # expires_at is a BSON date; Mongo's TTL monitor removes sessions once it passes
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    # _id is the user_id; workers poll for recent revoked_at, and a day covers any cache TTL
+    "session_revocations": [
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at_ttl", expireAfterSeconds=24 * 60 * 60),
+    ],
+    "services": [
+        IndexModel([("service_id", ASCENDING)], name="service_id_unique", unique=True),
+        # list_services: status is always set, category/platform are optional,
+        # keyset-paged newest first on (created_at, service_id)
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("service_id", DESCENDING)], name="status_created_at"),
+        IndexModel([("status", ASCENDING), ("category", ASCENDING), ("created_at", DESCENDING), ("service_id", DESCENDING)], name="status_category_created_at"),
+        IndexModel([("status", ASCENDING), ("platform", ASCENDING), ("created_at", DESCENDING), ("service_id", DESCENDING)], name="status_platform_created_at"),
+        IndexModel(
+            [("status", ASCENDING), ("category", ASCENDING), ("platform", ASCENDING), ("created_at", DESCENDING), ("service_id", DESCENDING)],
+            name="status_category_platform_created_at",
+        ),
+        # list_services?sort=price_asc|price_desc and min_price/max_price filters
+        IndexModel([("status", ASCENDING), ("min_price", ASCENDING), ("service_id", ASCENDING)], name="status_min_price"),
+        IndexModel([("status", ASCENDING), ("category", ASCENDING), ("min_price", ASCENDING), ("service_id", ASCENDING)], name="status_category_min_price"),
+        IndexModel([("creator_id", ASCENDING)], name="creator_id"),
+        # list_services?search=: relevance-ranked $text search
+        IndexModel(
+            [("title", TEXT), ("description", TEXT)],
+            name="title_description_text",
+            weights={"title": 10, "description": 2},
+            default_language="english",
+        ),
+    ],
+    "orders": [
+        IndexModel([("order_id", ASCENDING)], name="order_id_unique", unique=True),
+        # list_orders: equality on the owner, keyset-paged newest first
+        IndexModel([("client_id", ASCENDING), ("created_at", DESCENDING), ("order_id", DESCENDING)], name="client_id_created_at_order_id"),
+        IndexModel([("creator_id", ASCENDING), ("created_at", DESCENDING), ("order_id", DESCENDING)], name="creator_id_created_at_order_id"),
+        # trending refresh: paid orders inside the scoring window
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+        # admin exports over a date range
+        IndexModel([("created_at", DESCENDING), ("order_id", DESCENDING)], name="created_at_order_id"),
+    ],
+    "reviews": [
+        IndexModel([("review_id", ASCENDING)], name="review_id_unique", unique=True),
+        IndexModel([("order_id", ASCENDING)], name="order_id_unique", unique=True),
+        IndexModel([("service_id", ASCENDING), ("created_at", DESCENDING), ("review_id", DESCENDING)], name="service_id_created_at_review_id"),
+    ],
+    "payment_transactions": [
+        IndexModel([("payment_id", ASCENDING)], name="payment_id_unique", unique=True),
+        IndexModel([("session_id", ASCENDING)], name="session_id_unique", unique=True),
+        IndexModel([("order_id", ASCENDING)], name="order_id"),
+        # exports: per payer, per creator, or everything, keyset-paged newest first
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("payment_id", DESCENDING)], name="user_id_created_at_payment_id"),
+        IndexModel([("creator_id", ASCENDING), ("created_at", DESCENDING), ("payment_id", DESCENDING)], name="creator_id_created_at_payment_id"),
+        IndexModel([("created_at", DESCENDING), ("payment_id", DESCENDING)], name="created_at_payment_id"),
+    ],
+    # Rebuilt and renamed into place by trending.refresh_trending, which creates these on the new copy
+    "trending_services": [
+        IndexModel([("feed", ASCENDING), ("score", DESCENDING), ("service_id", DESCENDING)], name="feed_score_service_id"),
+    ],
+    # _id is the Stripe event id, which is what deduplicates redeliveries
+    "stripe_events": [
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+        IndexModel([("claim", ASCENDING)], name="claim", sparse=True),
+        IndexModel([("processed_at", ASCENDING)], name="processed_at_ttl", expireAfterSeconds=30 * 24 * 60 * 60),
+    ],
+}
+
+# Superseded index name -> the registry index that replaced it. The old one is
+# dropped only once its replacement exists, so a failed build never leaves the
+# collection without either.
+SUPERSEDED: Dict[str, Dict[str, str]] = {
+    "services": {
+        "status_category_platform": "status_category_platform_created_at",
+        "status_platform": "status_platform_created_at",
+    },
+    "orders": {
+        "client_id_created_at": "client_id_created_at_order_id",
+        "creator_id_created_at": "creator_id_created_at_order_id",
+    },
+    "reviews": {"service_id_created_at": "service_id_created_at_review_id"},
+}
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create every index in the registry and drop superseded ones. Safe to call on each startup."""
+    for collection, indexes in INDEXES.items():
+        # One command per index: a unique index blocked by duplicate data must
+        # not keep the collection's other indexes from being built.
+        for index in indexes:
+            try:
+                await db[collection].create_indexes([index])
+            except OperationFailure as e:
+                logger.error(f"Failed to create index {collection}.{index.document['name']}: {e}")
+    for collection, replaced in SUPERSEDED.items():
+        existing = await db[collection].index_information()
+        for name, replacement in replaced.items():
+            if name not in existing:
+                continue
+            if replacement not in existing:
+                logger.warning(f"Keeping {collection}.{name}: replacement {replacement} is not built")
+                continue
+            try:
+                await db[collection].drop_index(name)
+                logger.info(f"Dropped superseded index {collection}.{name}")
+            except OperationFailure as e:
+                # another worker got there first
+                logger.warning(f"Failed to drop index {collection}.{name}: {e}")
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorCollection
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import csv
+import io
+import orjson
+import zlib
+
+from pagination import encode_cursor, keyset_sort
+
+# Accounting exports streamed straight off a Motor cursor. Documents are
+# encoded and flushed one batch at a time, so a worker holds at most
+# batch_size rows whatever the size of the export. Rows come in keyset order
+# (created_at, id descending) and each carries its cursor token; a broken
+# download resumes with ?cursor=<last complete row's cursor>.
+
+@dataclass(frozen=True)
+class ExportSpec:
+    collection: str
+    id_field: str
+    columns: Tuple[str, ...]
+
+    def projection(self) -> Dict[str, int]:
+        return {"_id": 0, **{column: 1 for column in self.columns}}
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "orders": ExportSpec("orders", "order_id", (
+        "order_id", "created_at", "service_id", "tier_name", "creator_id", "client_id", "status", "price",
+        "revision_count", "max_revisions", "payment_session_id", "paid_at", "completed_at",
+    )),
+    "payments": ExportSpec("payment_transactions", "payment_id", (
+        "payment_id", "created_at", "order_id", "session_id", "user_id", "creator_id", "amount", "currency",
+        "payment_status", "updated_at",
+    )),
+}
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def encode_ndjson(rows: List[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+def csv_encoder(spec: ExportSpec) -> Callable[[List[Dict[str, Any]]], bytes]:
+    columns = (*spec.columns, "cursor")
+
+    def encode(rows: List[Dict[str, Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([_csv_value(row.get(column)) for column in columns] for row in rows)
+        return buffer.getvalue().encode()
+    return encode
+
+def csv_header(spec: ExportSpec) -> bytes:
+    return (",".join((*spec.columns, "cursor")) + "\n").encode()
+
+async def stream_export(collection: AsyncIOMotorCollection, spec: ExportSpec, query: Dict[str, Any], fmt: str,
+                        batch_size: int = 1000, header: bool = True) -> AsyncIterator[bytes]:
+    """Yield one encoded chunk per batch_size documents of `query`, newest first."""
+    encode = csv_encoder(spec) if fmt == "csv" else encode_ndjson
+    cursor = collection.find(query, spec.projection()).sort(keyset_sort(spec.id_field)).batch_size(batch_size)
+    try:
+        if fmt == "csv" and header:
+            yield csv_header(spec)
+        rows: List[Dict[str, Any]] = []
+        async for doc in cursor:
+            doc["cursor"] = encode_cursor(doc, spec.id_field)
+            rows.append(doc)
+            if len(rows) >= batch_size:
+                yield encode(rows)
+                rows = []
+        if rows:
+            yield encode(rows)
+    finally:
+        # client disconnects cancel the generator; release the server-side cursor too
+        await cursor.close()
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Gzip-framed (wbits 16+MAX_WBITS) incremental compression of an async byte stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_filename(kind: str, fmt: str, start: Optional[datetime], end: Optional[datetime]) -> str:
+    span = "-".join(d.date().isoformat() for d in (start, end) if d)
+    return f"{kind}{'-' + span if span else ''}.{FORMATS[fmt][1]}"
@@ -0,0 +1,134 @@
+from cachetools import LRUCache
+from metrics import Counter, add_collector
+from typing import Dict, List, Optional, Tuple
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # pinned in requirements.txt; without it responses fall back to gzip
+    brotli = None
+
+# ETag revalidation and compression for read-mostly JSON routes. Bodies are
+# buffered, hashed into a weak ETag (the same entity is served in several
+# encodings), and compressed at most once per (ETag, encoding).
+
+CONDITIONAL_RESPONSES = Counter(
+    "http_conditional_responses_total", "ETag/compression outcomes on cached routes.", ("outcome",)
+)
+add_collector(CONDITIONAL_RESPONSES.render)
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Prefer br over gzip; honours q=0 exclusions."""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+class ETagCompressionMiddleware:
+    """Pure ASGI middleware for GET routes under `path_prefixes`.
+
+    Matching If-None-Match gets a 304 with no body; otherwise 200 bodies of
+    at least `minimum_size` bytes are gzip/brotli encoded when accepted.
+    """
+
+    def __init__(self, app, path_prefixes: Tuple[str, ...], minimum_size: int = 1024,
+                 gzip_level: int = 6, brotli_quality: int = 5, cache_size: int = 512):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._encoded: LRUCache = LRUCache(maxsize=cache_size)
+
+    def _encode(self, etag: str, encoding: str, body: bytes) -> bytes:
+        key = (etag, encoding)
+        cached = self._encoded.get(key)
+        if cached is not None:
+            CONDITIONAL_RESPONSES.inc(("encode_cache_hit",))
+            return cached
+        if encoding == "br":
+            encoded = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            encoded = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        self._encoded[key] = encoded
+        return encoded
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "GET"
+                or not scope["path"].startswith(self.path_prefixes)):
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        chunks: List[bytes] = []
+
+        async def buffer(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._respond(scope, start_message, b"".join(chunks), send)
+
+        await self.app(scope, receive, buffer)
+
+    async def _respond(self, scope, start, body: bytes, send) -> None:
+        headers = [(k, v) for k, v in start["headers"] if k.lower() not in (b"content-length", b"etag")]
+        if start["status"] != 200 or _header(start["headers"], b"content-encoding"):
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        headers += [(b"etag", etag.encode()), (b"vary", b"Accept-Encoding")]
+
+        if etag_matches(_header(scope["headers"], b"if-none-match"), etag):
+            CONDITIONAL_RESPONSES.inc(("not_modified",))
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        encoding = choose_encoding(_header(scope["headers"], b"accept-encoding")) if len(body) >= self.minimum_size else None
+        if encoding:
+            body = self._encode(etag, encoding, body)
+            headers.append((b"content-encoding", encoding.encode()))
+            CONDITIONAL_RESPONSES.inc((encoding,))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
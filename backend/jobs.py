@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Periodic maintenance started from the lifespan handler. Every worker runs the
+# loop; a lease document in job_leases (_id = job name) lets only one of them
+# do the work per interval.
+
+class LeasedJob:
+    def __init__(self, db: AsyncIOMotorDatabase, name: str, work: Callable[[], Awaitable[Any]], interval: float):
+        self.db = db
+        self.name = name
+        self.work = work
+        self.interval = interval
+        self.holder = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def acquire_lease(self) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            await self.db.job_leases.find_one_and_update(
+                {"_id": self.name, "locked_until": {"$lte": now}},
+                {"$set": {"holder": self.holder, "locked_until": now + timedelta(seconds=self.interval)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False  # held by another worker until locked_until
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self.acquire_lease():
+                    await self.work()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {self.name} failed: {e}")
+            await asyncio.sleep(self.interval)
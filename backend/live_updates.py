@@ -0,0 +1,175 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+from typing import Any, Dict, Iterable, Optional, Set
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost: resuming
+# from the saved token can never succeed, so the stream restarts from "now"
+NON_RESUMABLE_CODES = {260, 280, 286}
+
+ORDER_FIELDS = ("order_id", "status", "client_id", "creator_id", "revision_count", "payment_session_id")
+PAYMENT_FIELDS = ("order_id", "session_id", "payment_status")
+
+def order_event(order: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "order", **{k: order.get(k) for k in ORDER_FIELDS}}
+
+def payment_event(payment: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "payment", **{k: payment.get(k) for k in PAYMENT_FIELDS}}
+
+# ==================== IN-PROCESS PUB/SUB ====================
+
+class Subscription:
+    """One connected client. Slow consumers lose their oldest events, never block publishers."""
+
+    def __init__(self, user_id: str, order_id: Optional[str], maxsize: int):
+        self.user_id = user_id
+        self.order_id = order_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        if self.order_id and event.get("order_id") != self.order_id:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+class Broker:
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, user_id: str, order_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(user_id, order_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.user_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscribers[sub.user_id]
+
+    def publish(self, event: Dict[str, Any], recipients: Iterable[Optional[str]]) -> None:
+        for user_id in set(recipients):
+            for sub in self._subscribers.get(user_id, ()):
+                sub.offer(event)
+
+    def stats(self) -> dict:
+        subs = [sub for group in self._subscribers.values() for sub in group]
+        return {
+            "users": len(self._subscribers),
+            "subscriptions": len(subs),
+            "dropped": sum(sub.dropped for sub in subs),
+        }
+
+# ==================== FEED ====================
+
+class LiveUpdates:
+    """Feeds the broker from Mongo change streams, or from the routes themselves.
+
+    mode "changestream" requires a replica set; "local" publishes whatever the
+    routes in this process report; "auto" tries change streams and falls back to
+    local when the server doesn't support them (e.g. a standalone mongod).
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, mode: str = "auto", queue_size: int = 100):
+        self.db = db
+        self.mode = mode
+        self.broker = Broker(queue_size=queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+
+    @property
+    def local(self) -> bool:
+        return self.mode == "local"
+
+    async def start(self) -> None:
+        if self.mode == "local":
+            return
+        try:
+            # Probe support up front so "auto" can fall back before serving traffic
+            async with self.db.orders.watch(max_await_time_ms=1) as stream:
+                await stream.try_next()
+        except OperationFailure as e:
+            if self.mode == "changestream":
+                raise
+            logger.warning(f"Change streams unavailable ({e}); using in-process live updates")
+            self.mode = "local"
+            return
+        self.mode = "changestream"
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        pipeline = [
+            {"$match": {
+                "ns.coll": {"$in": ["orders", "payment_transactions"]},
+                "operationType": {"$in": ["insert", "update", "replace"]},
+            }},
+        ]
+        backoff = 0.5
+        while True:
+            try:
+                async with self.db.watch(
+                    pipeline, full_document="updateLookup", resume_after=self._resume_token
+                ) as stream:
+                    backoff = 0.5
+                    async for change in stream:
+                        if change["operationType"] == "invalidate":
+                            break
+                        self._resume_token = stream.resume_token
+                        await self._dispatch(change["ns"]["coll"], change.get("fullDocument"))
+                # The stream only ends on an invalidate (database dropped or renamed),
+                # and resuming after one fails, so start over from now.
+                self._resume_token = None
+                logger.warning("Change stream invalidated; restarting from now")
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                if isinstance(e, OperationFailure) and e.code in NON_RESUMABLE_CODES:
+                    # updates in the gap are lost; clients catch up on their next fetch
+                    self._resume_token = None
+                    logger.warning(f"Change stream can't resume ({e}); restarting from now in {backoff:.1f}s")
+                else:
+                    logger.warning(f"Change stream interrupted ({e}); resuming in {backoff:.1f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    async def _dispatch(self, collection: str, doc: Optional[Dict[str, Any]]) -> None:
+        if not doc:
+            return
+        if collection == "orders":
+            self.broker.publish(order_event(doc), (doc.get("client_id"), doc.get("creator_id")))
+        else:
+            order = await self.db.orders.find_one(
+                {"order_id": doc.get("order_id")}, {"_id": 0, "client_id": 1, "creator_id": 1}
+            ) or {}
+            self.broker.publish(payment_event(doc), (doc.get("user_id"), order.get("creator_id")))
+
+    def order_changed(self, order: Optional[Dict[str, Any]]) -> None:
+        """Called by routes after an order write; only used when change streams are off."""
+        if self.local and order:
+            self.broker.publish(order_event(order), (order.get("client_id"), order.get("creator_id")))
+
+    def payment_changed(self, payment: Dict[str, Any], creator_id: Optional[str] = None) -> None:
+        if self.local:
+            self.broker.publish(payment_event(payment), (payment.get("user_id"), creator_id))
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
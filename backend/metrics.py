@@ -0,0 +1,207 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pymongo import monitoring
+from starlette.routing import Match
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import bisect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# ==================== PROMETHEUS PRIMITIVES ====================
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()  # Mongo events arrive on Motor's executor threads
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # one slot per bucket, then +Inf, sum
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames + ('le',), labels + (le,))} {cumulative:g}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]:.6f}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative:g}"
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), kind: str = "counter"):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.kind = kind
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value:g}"
+
+def Gauge(name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return Counter(name, help, labelnames, kind="gauge")
+
+# ==================== METRICS ====================
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.", ("method", "route"))
+MONGO_SECONDS = Histogram("mongo_command_duration_seconds", "MongoDB command latency.", ("collection", "command", "outcome"))
+OUTBOUND_SECONDS = Histogram("outbound_request_duration_seconds", "Outbound HTTP/Stripe call latency.", ("target", "outcome"))
+
+_collectors: List[Callable[[], Iterable[str]]] = []
+
+def add_collector(fn: Callable[[], Iterable[str]]) -> None:
+    """Register a callable that yields extra exposition lines at scrape time."""
+    _collectors.append(fn)
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in (REQUEST_SECONDS, REQUESTS_IN_FLIGHT, MONGO_SECONDS, OUTBOUND_SECONDS):
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+def gauge_lines(name: str, help: str, value: float, kind: str = "gauge") -> List[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {value:g}"]
+
+# ==================== PER-REQUEST BREAKDOWN ====================
+
+@dataclass
+class RequestTimings:
+    mongo_seconds: float = 0.0
+    mongo_commands: int = 0
+    outbound_seconds: float = 0.0
+    outbound_calls: int = 0
+    by_collection: Dict[str, float] = field(default_factory=dict)
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+def observe_outbound(target: str, seconds: float, ok: bool) -> None:
+    OUTBOUND_SECONDS.observe((target, "ok" if ok else "error"), seconds)
+    timings = current_timings.get()
+    if timings is not None:
+        timings.outbound_seconds += seconds
+        timings.outbound_calls += 1
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Times every command by collection and name.
+
+    Motor runs commands on executor threads with the caller's context copied
+    in, so the request's RequestTimings is visible here and shared by reference.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, Tuple[str, Optional[RequestTimings]]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        # getMore's command value is the cursor id; the collection is a separate field
+        target = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        collection = target if isinstance(target, str) else "-"
+        self._pending[event.request_id] = (collection, current_timings.get())
+
+    def _finish(self, event, outcome: str) -> None:
+        collection, timings = self._pending.pop(event.request_id, ("-", None))
+        seconds = event.duration_micros / 1e6
+        MONGO_SECONDS.observe((collection, event.command_name, outcome), seconds)
+        if timings is not None:
+            timings.mongo_seconds += seconds
+            timings.mongo_commands += 1
+            timings.by_collection[collection] = timings.by_collection.get(collection, 0.0) + seconds
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, "error")
+
+# ==================== MIDDLEWARE ====================
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses (SSE) pass through untouched."""
+
+    def __init__(self, app, router, slow_request_ms: float = 0, skip_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.router = router
+        self.slow_request_ms = slow_request_ms
+        self.skip_paths = skip_paths
+
+    def _route_path(self, scope) -> str:
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        route_path = self._route_path(scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        REQUESTS_IN_FLIGHT.inc((method, route_path))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec((method, route_path))
+            current_timings.reset(token)
+            REQUEST_SECONDS.observe((method, route_path, str(status["code"])), elapsed)
+            if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+                by_collection = {k: round(v * 1000, 1) for k, v in timings.by_collection.items()}
+                logger.warning(
+                    f"Slow request {method} {route_path} {status['code']} {elapsed * 1000:.1f}ms "
+                    f"mongo={timings.mongo_seconds * 1000:.1f}ms/{timings.mongo_commands} {by_collection} "
+                    f"outbound={timings.outbound_seconds * 1000:.1f}ms/{timings.outbound_calls} "
+                    f"other={(elapsed - timings.mongo_seconds - timings.outbound_seconds) * 1000:.1f}ms"
+                )
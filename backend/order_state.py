@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from enum import Enum
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from typing import Any, Dict, FrozenSet, List, Optional
+from datetime import datetime, timezone
+import asyncio
+import creator_stats
+
+# ==================== ORDER STATE MACHINE ====================
+# Every transition is a single find_one_and_update whose filter carries the
+# ownership check and the allowed source states, so two concurrent requests
+# can never both move the same order.
+
+CLIENT = "client"
+CREATOR = "creator"
+SYSTEM = "system"  # payment confirmations; no ownership check
+
+@dataclass(frozen=True)
+class Transition:
+    from_states: FrozenSet[str]
+    actors: FrozenSet[str]
+
+TRANSITIONS: Dict[str, Transition] = {
+    "paid": Transition(frozenset({"pending_payment"}), frozenset({SYSTEM})),
+    "in_progress": Transition(frozenset({"paid", "revision_requested"}), frozenset({CREATOR})),
+    "submitted": Transition(frozenset({"paid", "in_progress", "revision_requested"}), frozenset({CREATOR})),
+    "revision_requested": Transition(frozenset({"submitted"}), frozenset({CLIENT})),
+    "completed": Transition(frozenset({"submitted"}), frozenset({CLIENT, CREATOR})),
+    "cancelled": Transition(frozenset({"pending_payment", "paid"}), frozenset({CLIENT, CREATOR})),
+}
+
+class Outcome(str, Enum):
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    CONFLICT = "conflict"
+    INVALID = "invalid"
+
+@dataclass
+class TransitionResult:
+    outcome: Outcome
+    order: Optional[Dict[str, Any]] = None
+    current_status: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == Outcome.OK
+
+def _owner_filter(actors: FrozenSet[str], user_id: Optional[str]) -> Dict[str, Any]:
+    if user_id is None:
+        return {}  # system caller
+    clauses = [{f"{actor}_id": user_id} for actor in sorted(actors - {SYSTEM})]
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+async def _diagnose(db: AsyncIOMotorDatabase, order_id: str, actors: FrozenSet[str], user_id: Optional[str]) -> TransitionResult:
+    """Only runs after a failed transition, to tell not-found, forbidden and conflict apart."""
+    order = await db.orders.find_one(
+        {"order_id": order_id}, {"_id": 0, "status": 1, "client_id": 1, "creator_id": 1}
+    )
+    if not order:
+        return TransitionResult(Outcome.NOT_FOUND)
+    if user_id is not None and user_id not in (order["client_id"], order["creator_id"]):
+        return TransitionResult(Outcome.NOT_FOUND)
+    if user_id is not None and not any(order[f"{actor}_id"] == user_id for actor in actors - {SYSTEM}):
+        return TransitionResult(Outcome.FORBIDDEN, current_status=order["status"])
+    return TransitionResult(Outcome.CONFLICT, current_status=order["status"])
+
+async def transition_order(
+    db: AsyncIOMotorDatabase,
+    order_id: str,
+    target: str,
+    user_id: Optional[str] = None,
+    set_fields: Optional[Dict[str, Any]] = None,
+) -> TransitionResult:
+    """Move an order to `target` if `user_id` may and the order is in an allowed state."""
+    rule = TRANSITIONS.get(target)
+    if rule is None or (user_id is None and SYSTEM not in rule.actors):
+        return TransitionResult(Outcome.INVALID)
+    if user_id is not None and not rule.actors - {SYSTEM}:
+        # system-only targets (payment confirmation) are reachable through mark_order_paid alone
+        return TransitionResult(Outcome.FORBIDDEN)
+
+    query: Dict[str, Any] = {
+        "order_id": order_id,
+        "status": {"$in": sorted(rule.from_states)},
+        **_owner_filter(rule.actors, user_id),
+    }
+    update: Dict[str, Any] = {"$set": {"status": target, **(set_fields or {})}}
+    if target == "paid":
+        update["$set"]["paid_at"] = datetime.now(timezone.utc)
+    if target == "completed":
+        update["$set"]["completed_at"] = datetime.now(timezone.utc)
+    if target == "revision_requested":
+        query["$expr"] = {"$lt": ["$revision_count", "$max_revisions"]}
+        update["$inc"] = {"revision_count": 1}
+
+    # BEFORE, so the creator stats know which state the order left; the new
+    # state is fully determined by `update`
+    before = await db.orders.find_one_and_update(
+        query, update, projection={"_id": 0}, return_document=ReturnDocument.BEFORE
+    )
+    if not before:
+        return await _diagnose(db, order_id, rule.actors, user_id)
+    order = {**before, **update["$set"]}
+    if "$inc" in update:
+        order["revision_count"] = before.get("revision_count", 0) + 1
+    await creator_stats.order_transitioned(db, before, order)
+    return TransitionResult(Outcome.OK, order=order, current_status=target)
+
+async def transition_orders(
+    db: AsyncIOMotorDatabase,
+    order_ids: List[str],
+    target: str,
+    user_id: str,
+    concurrency: int = 8,
+) -> Dict[str, TransitionResult]:
+    """transition_order for each id, a bounded number at a time; results keyed by order_id."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(order_id: str) -> TransitionResult:
+        async with semaphore:
+            return await transition_order(db, order_id, target, user_id)
+
+    results = await asyncio.gather(*(one(order_id) for order_id in order_ids))
+    return dict(zip(order_ids, results))
+
+async def mark_order_paid(db: AsyncIOMotorDatabase, order_id: str) -> TransitionResult:
+    return await transition_order(db, order_id, "paid")
+
+async def mark_orders_paid(db: AsyncIOMotorDatabase, order_ids: List[str], concurrency: int = 8) -> List[Dict[str, Any]]:
+    """Bulk payment confirmation; returns the orders this call moved to paid.
+
+    Each order moves with its own guarded find_one_and_update, so only the
+    call that actually moved it gets its BEFORE document, and redeliveries or
+    retries find nothing left to count. Creator stats get one $inc per creator.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    update = {"$set": {"status": "paid", "paid_at": datetime.now(timezone.utc)}}
+
+    async def one(order_id: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await db.orders.find_one_and_update(
+                {"order_id": order_id, "status": {"$in": sorted(TRANSITIONS["paid"].from_states)}},
+                update,
+                projection={"_id": 0},
+                return_document=ReturnDocument.BEFORE
+            )
+
+    results = await asyncio.gather(*(one(order_id) for order_id in order_ids), return_exceptions=True)
+    paid = [{**before, **update["$set"]} for before in results if isinstance(before, dict)]
+    # count what did move before surfacing a failure; the retry skips those orders
+    await creator_stats.orders_transitioned(db, paid, "pending_payment")
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return paid
+
+async def attach_payment_session(db: AsyncIOMotorDatabase, order_id: str, client_id: str, session_id: str) -> bool:
+    """Record the checkout session only while the order is still awaiting payment."""
+    result = await db.orders.update_one(
+        {"order_id": order_id, "client_id": client_id, "status": "pending_payment"},
+        {"$set": {"payment_session_id": session_id}}
+    )
+    return result.matched_count == 1
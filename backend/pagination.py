@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+
+# Opaque keyset cursors over (<sort field>, <id field>), both descending.
+# The sort field is created_at everywhere except ranked feeds (score).
+
+def encode_cursor(doc: Dict[str, Any], id_field: str, sort_field: str = "created_at") -> str:
+    value = doc[sort_field]
+    if isinstance(value, datetime):
+        payload = {"d": value.isoformat(), "i": doc[id_field]}
+    else:
+        payload = {"s": value, "i": doc[id_field]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[Any, str]:
+    """Return (sort value, id). Raises ValueError on a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        last_id = str(payload["i"])
+        if "d" in payload:
+            return datetime.fromisoformat(payload["d"]), last_id
+        value = payload["s"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    # the value lands in an equality clause, where an object would act as a query operator
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError("Invalid cursor")
+    return value, last_id
+
+def keyset_query(query: Dict[str, Any], cursor: Optional[str], id_field: str, sort_field: str = "created_at") -> Dict[str, Any]:
+    """Add the "strictly after cursor" condition to `query`."""
+    if not cursor:
+        return query
+    value, last_id = decode_cursor(cursor)
+    after = {"$or": [
+        {sort_field: {"$lt": value}},
+        {sort_field: value, id_field: {"$lt": last_id}},
+    ]}
+    if "$or" in query or "$and" in query:
+        return {"$and": [query, after]}
+    return {**query, **after}
+
+def keyset_sort(id_field: str, sort_field: str = "created_at") -> List[Tuple[str, int]]:
+    return [(sort_field, -1), (id_field, -1)]
+
+def next_cursor(docs: List[Dict[str, Any]], limit: int, id_field: str, sort_field: str = "created_at") -> Optional[str]:
+    if len(docs) < limit:
+        return None
+    return encode_cursor(docs[-1], id_field, sort_field)
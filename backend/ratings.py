@@ -0,0 +1,66 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from typing import Any, Dict, List
+
+# Services keep running totals (rating_sum, review_count); the displayed
+# `rating` is derived from them inside the same update, so concurrent reviews
+# never overwrite each other's contribution.
+
+def add_rating_update(rating: int) -> List[Dict[str, Any]]:
+    """Update pipeline that adds one review to a service's aggregates atomically."""
+    return [
+        {"$set": {
+            # Services written before rating_sum existed: derive it from the stored average
+            "rating_sum": {"$add": [
+                {"$ifNull": ["$rating_sum", {"$multiply": [{"$ifNull": ["$rating", 0]}, {"$ifNull": ["$review_count", 0]}]}]},
+                rating,
+            ]},
+            "review_count": {"$add": [{"$ifNull": ["$review_count", 0]}, 1]},
+        }},
+        {"$set": {"rating": {"$round": [{"$divide": ["$rating_sum", "$review_count"]}, 1]}}},
+    ]
+
+async def reconcile_ratings(db: AsyncIOMotorDatabase, apply: bool = True, batch_size: int = 1000) -> Dict[str, Any]:
+    """Rebuild rating aggregates from the reviews collection and report drift.
+
+    Services with no reviews are reset to zero. Returns counts plus a sample of
+    drifted services; writes are only issued when `apply` is true.
+    """
+    actual: Dict[str, Dict[str, Any]] = {}
+    pipeline = [{"$group": {"_id": "$service_id", "rating_sum": {"$sum": "$rating"}, "review_count": {"$sum": 1}}}]
+    async for row in db.reviews.aggregate(pipeline, allowDiskUse=True):
+        actual[row["_id"]] = row
+
+    report = {"checked": 0, "drifted": 0, "updated": 0, "samples": []}
+    ops: List[UpdateOne] = []
+    projection = {"_id": 0, "service_id": 1, "rating": 1, "rating_sum": 1, "review_count": 1}
+    async for service in db.services.find({}, projection).batch_size(batch_size):
+        report["checked"] += 1
+        row = actual.get(service["service_id"], {"rating_sum": 0, "review_count": 0})
+        expected = {
+            "rating_sum": row["rating_sum"],
+            "review_count": row["review_count"],
+            "rating": round(row["rating_sum"] / row["review_count"], 1) if row["review_count"] else 0.0,
+        }
+        if all(service.get(k) == v for k, v in expected.items()):
+            continue
+
+        report["drifted"] += 1
+        if len(report["samples"]) < 20:
+            report["samples"].append({
+                "service_id": service["service_id"],
+                "stored": {k: service.get(k) for k in expected},
+                "expected": expected,
+            })
+        if not apply:
+            continue
+        ops.append(UpdateOne({"service_id": service["service_id"]}, {"$set": expected}))
+        if len(ops) >= batch_size:
+            result = await db.services.bulk_write(ops, ordered=False)
+            report["updated"] += result.modified_count
+            ops = []
+
+    if ops:
+        result = await db.services.bulk_write(ops, ordered=False)
+        report["updated"] += result.modified_count
+    return report
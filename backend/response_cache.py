@@ -0,0 +1,188 @@
+from cachetools import TTLCache
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import hashlib
+import json
+import math
+import orjson
+import time
+
+# Stored for loads that found nothing (a 404 probe), under the shorter negative TTL
+MISSING = {"__missing__": True}
+
+# ==================== BACKENDS ====================
+
+class MemoryBackend:
+    """Per-process LRU with a TTL on every entry."""
+
+    def __init__(self, maxsize: int = 5000, ttl: float = 30.0, negative_ttl: float = 5.0):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._missing = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+        self._generations: Dict[str, int] = {}
+        self._settle_until: Dict[str, float] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self._entries.get(key)
+        return value if value is not None else self._missing.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        if value is MISSING:
+            self._missing[key] = value
+        else:
+            self._entries[key] = value
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def bump(self, namespace: str, settle: float = 0.0) -> None:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        if settle > 0:
+            self._settle_until[namespace] = time.monotonic() + settle
+
+    async def settling(self, namespace: str) -> bool:
+        return self._settle_until.get(namespace, 0.0) > time.monotonic()
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+class RedisBackend:
+    """Shared backend for any Redis-protocol server (redis, valkey, dragonfly, ...)."""
+
+    def __init__(self, url: str, ttl: float = 30.0, negative_ttl: float = 5.0, prefix: str = "rc:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_URL is set but the 'redis' package is not installed") from e
+        self._redis = redis.from_url(url)
+        self.ttl = int(ttl)
+        self.negative_ttl = max(1, int(negative_ttl))
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self.prefix + key)
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any) -> None:
+        # orjson writes datetimes exactly as ORJSONResponse does, so hits and misses render identically
+        ttl = self.negative_ttl if value == MISSING else self.ttl
+        await self._redis.set(self.prefix + key, orjson.dumps(value), ex=ttl)
+
+    async def generation(self, namespace: str) -> int:
+        raw = await self._redis.get(f"{self.prefix}gen:{namespace}")
+        return int(raw) if raw is not None else 0
+
+    async def bump(self, namespace: str, settle: float = 0.0) -> None:
+        await self._redis.incr(f"{self.prefix}gen:{namespace}")
+        if settle > 0:
+            await self._redis.set(f"{self.prefix}settle:{namespace}", 1, ex=math.ceil(settle))
+
+    async def settling(self, namespace: str) -> bool:
+        return bool(await self._redis.exists(f"{self.prefix}settle:{namespace}"))
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+# ==================== CACHE ====================
+
+class ResponseCache:
+    """Read-through cache for public read endpoints.
+
+    Keys are a namespace, the namespace's current generation and a hash of the
+    normalized query params. Invalidating a namespace bumps its generation, so
+    entries written by a load that raced the invalidation are never read again.
+    Invalidation is per namespace, not per entry: one bump drops every cached
+    page of that namespace (callers skip the bump for writes that can't show
+    up in it).
+
+    Concurrent misses on one key in this process share a single load. The load
+    runs in its own task, so a caller that disconnects mid-load doesn't cancel
+    it for the others. A load that returns None is cached as MISSING for the
+    backend's negative TTL.
+
+    Loaders may read from lagging secondaries. For `settle_seconds` after an
+    invalidation (the replicas' maximum lag) settling() is true, and loaders
+    should read the primary instead, or a lagging secondary could cache the
+    pre-write data under the new generation.
+    """
+
+    def __init__(self, backend, settle_seconds: float = 0.0):
+        self.backend = backend
+        self.settle_seconds = settle_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def normalize(params: Dict[str, Any]) -> str:
+        cleaned = {}
+        for name, value in params.items():
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+                if not value:
+                    continue
+            cleaned[name] = value
+        raw = json.dumps(cleaned, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    async def get_or_load(self, namespace: str, params: Dict[str, Any], loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = await self.backend.generation(namespace)
+        key = f"{namespace}:{generation}:{self.normalize(params)}"
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.create_task(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # shield: cancelling this caller leaves the shared load running
+        value = await asyncio.shield(task)
+        return None if value == MISSING else value
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await loader()
+        if value is None:
+            value = MISSING
+        await self.backend.set(key, value)
+        return value
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # callers re-raise it; don't log it as unretrieved when they all left
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            await self.backend.bump(namespace, self.settle_seconds)
+
+    async def settling(self, namespace: str) -> bool:
+        """Whether `namespace` was invalidated within the last settle_seconds."""
+        return self.settle_seconds > 0 and await self.backend.settling(namespace)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "inflight": len(self._inflight),
+        }
+
+def response_cache_from_env(url: Optional[str], ttl: float, maxsize: int, negative_ttl: float = 5.0,
+                            settle_seconds: float = 0.0) -> ResponseCache:
+    if url:
+        return ResponseCache(RedisBackend(url, ttl=ttl, negative_ttl=negative_ttl), settle_seconds)
+    return ResponseCache(MemoryBackend(maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl), settle_seconds)
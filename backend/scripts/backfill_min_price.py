@@ -0,0 +1,34 @@
+"""Set min_price on services created before it was stored.
+
+Computed server-side from tiers.price, so no documents are read back.
+
+    python scripts/backfill_min_price.py [--all]
+"""
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+async def main(recompute_all: bool) -> None:
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    query = {} if recompute_all else {"min_price": {"$exists": False}}
+    try:
+        # $min over an empty or missing tiers array yields null, same as tier_min_price
+        result = await db.services.update_many(query, [{"$set": {"min_price": {"$min": "$tiers.price"}}}])
+    finally:
+        client.close()
+    print(json.dumps({"matched": result.matched_count, "updated": result.modified_count}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true", help="recompute every service, not just those missing min_price")
+    args = parser.parse_args()
+    asyncio.run(main(args.all))
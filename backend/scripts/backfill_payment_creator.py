@@ -0,0 +1,39 @@
+"""Set creator_id on payment_transactions recorded before it was stored.
+
+Joined from orders and merged back server-side, so no documents are read back.
+
+    python scripts/backfill_payment_creator.py
+"""
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+PIPELINE = [
+    {"$match": {"creator_id": {"$exists": False}}},
+    {"$lookup": {"from": "orders", "localField": "order_id", "foreignField": "order_id", "as": "order"}},
+    {"$unwind": "$order"},
+    {"$project": {"_id": 1, "creator_id": "$order.creator_id"}},
+    {"$merge": {"into": "payment_transactions", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+]
+
+async def main() -> None:
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        missing = await db.payment_transactions.count_documents({"creator_id": {"$exists": False}})
+        await db.payment_transactions.aggregate(PIPELINE, allowDiskUse=True).to_list(length=None)
+        remaining = await db.payment_transactions.count_documents({"creator_id": {"$exists": False}})
+    finally:
+        client.close()
+    # anything remaining references an order that no longer exists
+    print(json.dumps({"missing": missing, "updated": missing - remaining, "orphaned": remaining}, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Fail if any route's query falls back to a collection scan.
+
+Runs explain() for every query shape issued by server.py against a local
+mongod, after applying the index registry from db_indexes.py.
+
+    MONGO_URL=mongodb://localhost:27017 python scripts/check_query_plans.py
+"""
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from db_indexes import INDEXES  # noqa: E402
+
+# (route, collection, filter, sort)
+QUERY_SHAPES = [
+    ("require_auth", "user_sessions", {"session_token": "session_x"}, None),
+    ("create_session", "users", {"email": "a@example.com"}, None),
+    ("get_current_user", "users", {"user_id": "user_x"}, None),
+    ("logout", "user_sessions", {"user_id": "user_x"}, None),
+    ("revocation_feed", "session_revocations", {"revoked_at": {"$gte": datetime(2024, 1, 1)}}, None),
+    ("list_services", "services", {"status": "active"}, [("created_at", -1), ("service_id", -1)]),
+    ("list_services", "services", {"status": "active", "category": "thumbnails"}, [("created_at", -1), ("service_id", -1)]),
+    ("list_services", "services", {"status": "active", "platform": "youtube"}, [("created_at", -1), ("service_id", -1)]),
+    ("list_services", "services", {"status": "active", "category": "thumbnails", "platform": "youtube"}, [("created_at", -1), ("service_id", -1)]),
+    ("list_services", "services", {"status": "active", "category": "thumbnails", "$text": {"$search": "edit"}}, None),
+    ("list_services", "services", {"status": "active", "min_price": {"$lte": 50}}, [("min_price", 1), ("service_id", 1)]),
+    ("list_services", "services", {"status": "active", "category": "thumbnails"}, [("min_price", -1), ("service_id", -1)]),
+    ("get_service", "services", {"service_id": "svc_x"}, None),
+    ("update_service", "services", {"service_id": "svc_x", "creator_id": "user_x"}, None),
+    ("get_creator_services", "services", {"creator_id": "user_x"}, None),
+    ("batch_get_services", "services", {"service_id": {"$in": ["svc_x", "svc_y"]}}, None),
+    ("batch_update_services", "services", {"service_id": {"$in": ["svc_x", "svc_y"]}, "creator_id": "user_x"}, None),
+    ("get_trending_services", "trending_services", {"feed": "category:thumbnails"}, [("score", -1), ("service_id", -1)]),
+    ("refresh_trending", "orders", {"status": {"$in": ["paid", "completed"]}, "created_at": {"$gte": "2026-01-01"}}, None),
+    ("list_orders", "orders", {"client_id": "user_x"}, [("created_at", -1), ("order_id", -1)]),
+    ("list_orders", "orders", {"creator_id": "user_x"}, [("created_at", -1), ("order_id", -1)]),
+    ("get_order", "orders", {"order_id": "ord_x"}, None),
+    ("create_checkout", "orders", {"order_id": "ord_x", "client_id": "user_x"}, None),
+    ("check_payment_status", "payment_transactions", {"session_id": "cs_x"}, None),
+    ("export_records", "orders", {"creator_id": "user_x", "created_at": {"$gte": "2026-01-01"}}, [("created_at", -1), ("order_id", -1)]),
+    ("export_records", "orders", {"created_at": {"$gte": "2026-01-01", "$lt": "2026-02-01"}}, [("created_at", -1), ("order_id", -1)]),
+    ("export_records", "payment_transactions", {"user_id": "user_x"}, [("created_at", -1), ("payment_id", -1)]),
+    ("export_records", "payment_transactions", {"creator_id": "user_x"}, [("created_at", -1), ("payment_id", -1)]),
+    ("export_records", "payment_transactions", {"created_at": {"$gte": "2026-01-01"}}, [("created_at", -1), ("payment_id", -1)]),
+    ("create_review", "reviews", {"order_id": "ord_x"}, None),
+    ("get_service_reviews", "reviews", {"service_id": "svc_x"}, [("created_at", -1), ("review_id", -1)]),
+]
+
+def find_stages(plan, found=None):
+    found = found if found is not None else []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            found.append(plan["stage"])
+        for value in plan.values():
+            find_stages(value, found)
+    elif isinstance(plan, list):
+        for value in plan:
+            find_stages(value, found)
+    return found
+
+def main() -> int:
+    client = MongoClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("EXPLAIN_DB_NAME", "query_plan_check")]
+
+    for collection, indexes in INDEXES.items():
+        db[collection].create_indexes(indexes)
+
+    failures = 0
+    for route, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        stages = find_stages(plan)
+        ok = "COLLSCAN" not in stages
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {route:<24} {collection}.find({query}) -> {' > '.join(stages)}")
+
+    client.close()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Convert ISO-string timestamps written by older releases into BSON datetimes.
+
+Keyset cursors and range filters compare created_at by BSON type, so strings
+left behind sort apart from new documents until this has run, and the
+user_sessions TTL index only expires sessions whose expires_at is a date.
+
+    python scripts/migrate_dates.py [--dry-run] [--batch-size 1000] [--collection user_sessions ...]
+"""
+import argparse
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+DATE_FIELDS = {
+    "user_sessions": ("expires_at", "created_at"),
+    "users": ("created_at",),
+    "services": ("created_at",),
+    "orders": ("created_at", "completed_at"),
+    "payment_transactions": ("created_at", "updated_at"),
+    "reviews": ("created_at",),
+}
+
+def to_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+async def migrate_collection(collection, fields, apply: bool, batch_size: int) -> dict:
+    report = {"scanned": 0, "updated": 0, "unparseable": 0}
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+    ops = []
+    async for doc in collection.find(query, projection).batch_size(batch_size):
+        report["scanned"] += 1
+        converted = {}
+        for field in fields:
+            if isinstance(doc.get(field), str):
+                try:
+                    converted[field] = to_datetime(doc[field])
+                except ValueError:
+                    report["unparseable"] += 1
+        if not converted or not apply:
+            continue
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": converted}))
+        if len(ops) >= batch_size:
+            result = await collection.bulk_write(ops, ordered=False)
+            report["updated"] += result.modified_count
+            ops = []
+    if ops:
+        result = await collection.bulk_write(ops, ordered=False)
+        report["updated"] += result.modified_count
+    return report
+
+async def main(dry_run: bool, batch_size: int, collections: list) -> None:
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        report = {
+            name: await migrate_collection(db[name], fields, not dry_run, batch_size)
+            for name, fields in DATE_FIELDS.items()
+            if name in collections
+        }
+    finally:
+        client.close()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--collection", action="append", choices=list(DATE_FIELDS), help="default: all")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run, args.batch_size, args.collection or list(DATE_FIELDS)))
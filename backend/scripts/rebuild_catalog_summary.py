@@ -0,0 +1,35 @@
+"""Recount the catalog facet summary from services.
+
+Prints a JSON drift report (stored minus recounted, per path). Use
+--dry-run to only report.
+
+    python scripts/rebuild_catalog_summary.py [--dry-run]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+from catalog_facets import rebuild_catalog_summary  # noqa: E402
+
+async def main(dry_run: bool) -> None:
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        report = await rebuild_catalog_summary(client[os.environ['DB_NAME']], apply=not dry_run)
+    finally:
+        client.close()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
@@ -0,0 +1,36 @@
+"""Recompute every creator's dashboard stats from orders and reviews.
+
+Streams the aggregation results and writes them back in batches. Prints a
+JSON report; use --dry-run to only aggregate.
+
+    python scripts/rebuild_creator_stats.py [--dry-run] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+from creator_stats import rebuild_creator_stats  # noqa: E402
+
+async def main(dry_run: bool, batch_size: int) -> None:
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+    try:
+        report = await rebuild_creator_stats(client[os.environ['DB_NAME']], apply=not dry_run, batch_size=batch_size)
+    finally:
+        client.close()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run, args.batch_size))
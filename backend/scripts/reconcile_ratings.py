@@ -0,0 +1,35 @@
+"""Rebuild every service's rating aggregates from the reviews collection.
+
+Prints a JSON drift report. Use --dry-run to only report.
+
+    python scripts/reconcile_ratings.py [--dry-run] [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+from ratings import reconcile_ratings  # noqa: E402
+
+async def main(dry_run: bool, batch_size: int) -> None:
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        report = await reconcile_ratings(client[os.environ['DB_NAME']], apply=not dry_run, batch_size=batch_size)
+    finally:
+        client.close()
+    print(json.dumps(report, indent=2, default=str))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run, args.batch_size))
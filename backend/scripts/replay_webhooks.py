@@ -0,0 +1,40 @@
+"""Put stored Stripe webhook events back on the queue for the running workers.
+
+    python scripts/replay_webhooks.py --status failed
+    python scripts/replay_webhooks.py --event evt_123 --event evt_456
+    python scripts/replay_webhooks.py --since 2026-01-01T00:00:00+00:00
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+from webhook_queue import WebhookQueue  # noqa: E402
+
+async def main(args: argparse.Namespace) -> None:
+    if not (args.event or args.status or args.since):
+        sys.exit("Refusing to replay every event; pass --event, --status or --since")
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        queue = WebhookQueue(client[os.environ['DB_NAME']])
+        since = datetime.fromisoformat(args.since) if args.since else None
+        replayed = await queue.replay(event_ids=args.event, status=args.status, since=since)
+        print(json.dumps({"replayed": replayed, "queue": await queue.stats()}, indent=2))
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--event", action="append", help="Stripe event id (repeatable)")
+    parser.add_argument("--status", choices=["pending", "processing", "done", "failed"])
+    parser.add_argument("--since", help="ISO timestamp; replay events received at or after it")
+    asyncio.run(main(parser.parse_args()))
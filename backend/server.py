@@ -1,27 +1,65 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Header, Request, Depends, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional, Dict, Any
 import uuid
+import json
+import asyncio
+import time
 from datetime import datetime, timezone, timedelta
 import cloudinary
 import cloudinary.uploader
-from emergentintegrations.payments.stripe.checkout import StripeCheckout, CheckoutSessionResponse, CheckoutStatusResponse, CheckoutSessionRequest
-import httpx
+from emergentintegrations.payments.stripe.checkout import CheckoutSessionResponse, CheckoutStatusResponse, CheckoutSessionRequest
+from contextlib import asynccontextmanager
+from cachetools import TTLCache
+from db_indexes import ensure_indexes
+from db_client import MongoConnection, DatabaseHandle
+from session_cache import RevocationFeed, SessionCache, parse_expires_at, record_revocations
+from pagination import keyset_query, keyset_sort, next_cursor
+from exports import EXPORTS, FORMATS, export_filename, gzip_stream, stream_export
+from ratings import add_rating_update
+from clients import OutboundClients
+from response_cache import response_cache_from_env
+from order_state import CLIENT, CREATOR, TRANSITIONS, Outcome, TransitionResult, transition_order, transition_orders, mark_order_paid, attach_payment_session
+from live_updates import LiveUpdates, format_sse
+from webhook_queue import WebhookQueue
+from trending import TrendingRefresher, TrendingWeights, feed_name
+from catalog_facets import facet_pipeline, format_facets, get_catalog_summary, ensure_catalog_summary, rebuild_catalog_summary, repair_catalog_summary, apply_service_change, apply_service_changes
+from jobs import LeasedJob
+import metrics
+import creator_stats
+from metrics import MetricsMiddleware, MongoCommandTimer
+from http_caching import ETagCompressionMiddleware
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, opened in the lifespan handler (one pool per worker process).
+# `db` reads and writes on the primary: orders, payments, sessions and every write path.
+# `catalog_db` serves staleness-tolerant reads (catalog, reviews, counts, batch lookups,
+# exports) from secondaries per CATALOG_READ_PREFERENCE / CATALOG_MAX_STALENESS_SECONDS.
+# Response-cache loaders pick theirs with catalog_reader(). Creators' own service lists
+# stay on the primary so an edit shows up on the creator's next read.
+mongo = MongoConnection.from_env(event_listeners=[MongoCommandTimer()])
+db = DatabaseHandle(mongo)
+catalog_db = DatabaseHandle(mongo, replica=True)
+
+# In-process session_token -> user_id cache used by require_auth
+session_cache = SessionCache(
+    maxsize=int(os.getenv('SESSION_CACHE_SIZE', '10000')),
+    ttl=float(os.getenv('SESSION_CACHE_TTL', '60')),
+    negative_ttl=float(os.getenv('SESSION_CACHE_NEGATIVE_TTL', '5'))
+)
+# Applies logouts and revocations made on other workers to this worker's session_cache
+revocations = RevocationFeed(db, session_cache, interval=float(os.getenv('SESSION_REVOCATION_POLL_SECONDS', '2')))
 
 # Initialize Cloudinary
 cloudinary.config(
@@ -30,8 +68,70 @@ cloudinary.config(
     api_secret=os.getenv('CLOUDINARY_API_SECRET', '')
 )
 
+# Read-through cache for the public catalog routes (in-memory LRU, or Redis when RESPONSE_CACHE_URL is set)
+response_cache = response_cache_from_env(
+    os.getenv('RESPONSE_CACHE_URL'),
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', '30')),
+    maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', '5000')),
+    negative_ttl=float(os.getenv('RESPONSE_CACHE_NEGATIVE_TTL', '5')),
+    # a secondary may lag this far; loads read the primary for this long after an invalidation
+    settle_seconds=0.0 if os.getenv('CATALOG_READ_PREFERENCE', 'secondaryPreferred') == 'primary'
+    else max(90.0, float(os.getenv('CATALOG_MAX_STALENESS_SECONDS', '90')))
+)
+
+# Shared outbound HTTP/Stripe clients, opened in the lifespan handler
+outbound = OutboundClients.from_env()
+
+# Order/payment push updates: Mongo change streams, or in-process when unavailable
+live = LiveUpdates(
+    db,
+    mode=os.getenv('LIVE_UPDATES_MODE', 'auto'),
+    queue_size=int(os.getenv('LIVE_UPDATES_QUEUE_SIZE', '100'))
+)
+LIVE_HEARTBEAT_SECONDS = 15
+
+async def publish_paid(order_ids: List[str], session_ids: List[str]) -> None:
+    if not live.local:
+        return
+    async for order in db.orders.find({"order_id": {"$in": order_ids}}, {"_id": 0}):
+        live.order_changed(order)
+    async for payment in db.payment_transactions.find({"session_id": {"$in": session_ids}}, {"_id": 0}):
+        live.payment_changed(payment, payment.get("creator_id"))
+
+# Durable Stripe webhook queue, drained by background workers started in the lifespan handler
+webhook_queue = WebhookQueue(
+    db,
+    workers=int(os.getenv('WEBHOOK_WORKERS', '2')),
+    batch_size=int(os.getenv('WEBHOOK_BATCH_SIZE', '100')),
+    max_attempts=int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '8')),
+    poll_interval=float(os.getenv('WEBHOOK_POLL_INTERVAL', '1')),
+    on_paid=publish_paid
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    mongo.open()
+    await ensure_indexes(db)
+    await ensure_catalog_summary(db)
+    await revocations.start()
+    await outbound.start()
+    await live.start()
+    await webhook_queue.start()
+    await trending.start()
+    await summary_repair.start()
+    yield
+    await summary_repair.stop()
+    await trending.stop()
+    await webhook_queue.stop()
+    await live.stop()
+    await outbound.close()
+    await revocations.stop()
+    await response_cache.close()
+    mongo.close()
+
 # Create the main app
-app = FastAPI()
+# orjson renders datetimes natively; hot read routes return ORJSONResponse directly to skip jsonable_encoder
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # ==================== MODELS ====================
@@ -68,7 +168,9 @@ class Service(BaseModel):
     tiers: List[ServiceTier]
     portfolio_urls: List[str] = []  # Cloudinary URLs
     thumbnail_url: Optional[str] = None
+    min_price: Optional[float] = None  # derived from tiers, kept in sync by create/update_service
     rating: float = 0.0
+    rating_sum: float = 0.0
     review_count: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     status: str = "active"  # active, paused, deleted
@@ -80,7 +182,7 @@ class Order(BaseModel):
     client_id: str
     tier_name: str
     price: float
-    status: str = "pending_payment"  # pending_payment, paid, in_progress, submitted, revision_requested, completed, cancelled
+    status: str = "pending_payment"  # pending_payment, paid, in_progress, submitted, revision_requested, completed, cancelled (see order_state.TRANSITIONS)
     requirements: str
     delivery_files: List[str] = []  # Cloudinary URLs
     revision_count: int = 0
@@ -88,6 +190,7 @@ class Order(BaseModel):
     notes: List[Dict[str, str]] = []  # [{"from": "client/creator", "message": "...", "timestamp": "..."}]
     payment_session_id: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    paid_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
 class Review(BaseModel):
@@ -107,9 +210,139 @@ class PaymentTransaction(BaseModel):
     currency: str = "usd"
     payment_status: str = "initiated"  # initiated, completed, failed, refunded
     user_id: str
+    creator_id: Optional[str] = None  # the order's creator, so accounting exports filter payments without a join
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# ==================== PAGINATION HELPERS ====================
+
+MAX_PAGE_SIZE = 100
+MAX_REVOKE_USERS = 1000
+MAX_BATCH_SIZE = 100
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+MAX_EXPORT_BATCH_SIZE = 10000
+# Fields a creator may change through PUT or the bulk update; everything else is derived or system-owned
+EDITABLE_SERVICE_FIELDS = {"title", "description", "category", "platform", "tiers", "portfolio_urls", "thumbnail_url", "status"}
+SERVICE_STATUSES = {"active", "paused", "deleted"}
+# What catalog_facets counts; read back from update writes to adjust the summary
+SUMMARY_FIELDS = {"_id": 0, "status": 1, "category": 1, "platform": 1}
+PRICE_SORTS = {
+    "price_asc": [("min_price", 1), ("service_id", 1)],
+    "price_desc": [("min_price", -1), ("service_id", -1)],
+}
+count_cache = TTLCache(maxsize=1024, ttl=int(os.getenv('COUNT_CACHE_TTL', '30')))
+
+def paged_query(query: Dict[str, Any], cursor: Optional[str], id_field: str, sort_field: str = "created_at") -> Dict[str, Any]:
+    try:
+        return keyset_query(query, cursor, id_field, sort_field)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def cached_count(collection: str, query: Dict[str, Any]) -> int:
+    """count_documents, memoized for a short TTL so page loads don't each pay for a count"""
+    key = (collection, json.dumps(query, sort_keys=True, default=str))
+    total = count_cache.get(key)
+    if total is None:
+        total = await catalog_db[collection].count_documents(query)
+        count_cache[key] = total
+    return total
+
+# ==================== SERVICE CARD HELPERS ====================
+
+# What list views render; the full document (every tier and portfolio URL) is only for detail pages
+CARD_PROJECTION = {
+    "_id": 0,
+    "service_id": 1,
+    "creator_id": 1,
+    "title": 1,
+    "description": {"$substrCP": ["$description", 0, 200]},
+    "category": 1,
+    "platform": 1,
+    "thumbnail_url": 1,
+    "min_price": 1,
+    "rating": 1,
+    "review_count": 1,
+    "status": 1,
+    "created_at": 1,
+}
+SERVICE_FIELDS = set(Service.model_fields)
+
+def service_projection(fields: Optional[str]) -> Dict[str, Any]:
+    """Card projection by default; fields=all for full documents, or a comma-separated field list"""
+    if not fields:
+        return dict(CARD_PROJECTION)
+    if fields == "all":
+        return {"_id": 0}
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - SERVICE_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # keyset cursors are built from these
+    projection = {"_id": 0, "service_id": 1, "created_at": 1}
+    projection.update({f: 1 for f in requested})
+    return projection
+
+async def repair_summary() -> None:
+    report = await repair_catalog_summary(db)
+    if report["applied"]:
+        logger.warning(f"Catalog summary corrected: {report['corrected']}")
+        await response_cache.invalidate("services:list")
+
+# Recounts the $inc-maintained facet summary and corrects drift that persists across runs
+summary_repair = LeasedJob(
+    db, "catalog_summary_repair", repair_summary,
+    interval=float(os.getenv('CATALOG_SUMMARY_REPAIR_SECONDS', '900'))
+)
+
+# Ranked feeds rebuilt in the background (lifespan) into trending_services
+trending = TrendingRefresher(
+    db,
+    CARD_PROJECTION,
+    TrendingWeights.from_env(),
+    interval=float(os.getenv('TRENDING_REFRESH_SECONDS', '300')),
+    on_refresh=lambda: response_cache.invalidate("trending")
+)
+
+def tier_min_price(tiers: List[Dict[str, Any]]) -> Optional[float]:
+    prices = [t["price"] for t in tiers if isinstance(t, dict) and isinstance(t.get("price"), (int, float))]
+    return min(prices) if prices else None
+
+def with_derived_fields(updates: Dict[str, Any]) -> Dict[str, Any]:
+    """min_price is never client-supplied; it follows tiers"""
+    updates = {k: v for k, v in updates.items() if k != "min_price"}
+    if "tiers" in updates:
+        updates["min_price"] = tier_min_price(updates["tiers"] or [])
+    return updates
+
+async def catalog_reader(namespace: str) -> DatabaseHandle:
+    """Secondaries for cached catalog loads, except while a write to `namespace` may not have replicated"""
+    return db if await response_cache.settling(namespace) else catalog_db
+
+def listed(*versions: Optional[Dict[str, Any]]) -> bool:
+    """Whether a service, before or after a write, can appear in GET /services (active ones only)"""
+    return any(version and version.get("status") == "active" for version in versions)
+
+def validated_service_updates(updates: Any, name: str) -> Dict[str, Any]:
+    """Check a client-supplied $set against the editable fields and statuses, then add derived fields"""
+    if not isinstance(updates, dict) or not updates:
+        raise HTTPException(status_code=400, detail=f"{name} must be a non-empty object")
+    unknown = set(updates) - EDITABLE_SERVICE_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Fields not editable: {', '.join(sorted(unknown))}")
+    if "status" in updates and updates["status"] not in SERVICE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {updates['status']}")
+    return with_derived_fields(updates)
+
+def batch_ids(payload: Dict[str, Any], key: str) -> List[str]:
+    """Validate a list of ids from a batch request body, de-duplicated in request order"""
+    ids = payload.get(key)
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+        raise HTTPException(status_code=400, detail=f"{key} must be a non-empty list of strings")
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} {key} per request")
+    return ids
+
 # ==================== AUTH HELPER ====================
 
 async def get_user_from_session(authorization: Optional[str] = Header(None), session_token: Optional[str] = None) -> Optional[str]:
@@ -121,19 +354,22 @@ async def get_user_from_session(authorization: Optional[str] = Header(None), ses
     if not token:
         return None
     
-    session = await db.user_sessions.find_one({"session_token": token}, {"_id": 0})
+    found, user_id = session_cache.get(token)
+    if found:
+        return user_id
+    
+    read_at = time.time()
+    session = await db.user_sessions.find_one({"session_token": token}, {"_id": 0, "user_id": 1, "expires_at": 1})
     if not session:
+        session_cache.set(token, None)
         return None
     
-    expires_at = session["expires_at"]
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-    
+    expires_at = parse_expires_at(session["expires_at"])
     if expires_at < datetime.now(timezone.utc):
+        session_cache.set(token, None)
         return None
     
+    session_cache.set(token, session["user_id"], expires_at, read_at=read_at)
     return session["user_id"]
 
 async def require_auth(authorization: Optional[str] = Header(None)) -> str:
@@ -142,6 +378,12 @@ async def require_auth(authorization: Optional[str] = Header(None)) -> str:
         raise HTTPException(status_code=401, detail="Unauthorized")
     return user_id
 
+async def require_admin(user_id: str = Depends(require_auth)) -> str:
+    user = await db.users.find_one({"user_id": user_id}, {"_id": 0, "user_type": 1})
+    if not user or user.get("user_type") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    return user_id
+
 # ==================== AUTH ROUTES ====================
 
 @api_router.post("/auth/session")
@@ -150,16 +392,10 @@ async def create_session(session_id: str = Header(None, alias="X-Session-ID"), r
     if not session_id:
         raise HTTPException(status_code=400, detail="Missing X-Session-ID header")
     
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(
-                "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-                headers={"X-Session-ID": session_id}
-            )
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            raise HTTPException(status_code=401, detail=f"Invalid session: {str(e)}")
+    try:
+        data = await outbound.fetch_session_data(session_id)
+    except Exception as e:
+        raise HTTPException(status_code=401, detail=f"Invalid session: {str(e)}")
     
     email = data.get("email")
     name = data.get("name")
@@ -169,8 +405,7 @@ async def create_session(session_id: str = Header(None, alias="X-Session-ID"), r
     if not user:
         user_obj = User(email=email, name=name, picture=picture)
         user_dict = user_obj.model_dump()
-        user_dict["created_at"] = user_dict["created_at"].isoformat()
-        await db.users.insert_one(user_dict)
+        await db.users.insert_one(user_dict.copy())
         user = user_dict
     
     session_token = f"session_{uuid.uuid4().hex}"
@@ -181,10 +416,7 @@ async def create_session(session_id: str = Header(None, alias="X-Session-ID"), r
         session_token=session_token,
         expires_at=expires_at
     )
-    session_dict = session_obj.model_dump()
-    session_dict["created_at"] = session_dict["created_at"].isoformat()
-    session_dict["expires_at"] = session_dict["expires_at"].isoformat()
-    await db.user_sessions.insert_one(session_dict)
+    await db.user_sessions.insert_one(session_obj.model_dump())
     
     response.set_cookie(
         key="session_token",
@@ -211,17 +443,47 @@ async def get_current_user(user_id: str = Depends(require_auth)):
 @api_router.post("/auth/logout")
 async def logout(user_id: str = Depends(require_auth), response: Response = None):
     await db.user_sessions.delete_many({"user_id": user_id})
+    await record_revocations(db, [user_id])
+    session_cache.revoke_users({user_id: time.time()})
     response.delete_cookie("session_token", path="/")
     return {"message": "Logged out"}
 
+@api_router.get("/admin/session-cache")
+async def get_session_cache_stats(user_id: str = Depends(require_admin)):
+    return session_cache.stats()
+
+@api_router.get("/admin/response-cache")
+async def get_response_cache_stats(user_id: str = Depends(require_admin)):
+    return response_cache.stats()
+
+@api_router.post("/admin/sessions/revoke")
+async def revoke_sessions(payload: Dict[str, Any], user_id: str = Depends(require_admin)):
+    """Log the given users out everywhere. Other workers drop their cached tokens within SESSION_REVOCATION_POLL_SECONDS."""
+    user_ids = payload.get("user_ids")
+    if not isinstance(user_ids, list) or not user_ids or not all(isinstance(u, str) for u in user_ids):
+        raise HTTPException(status_code=400, detail="user_ids must be a non-empty list of strings")
+    if len(user_ids) > MAX_REVOKE_USERS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_REVOKE_USERS} user_ids per request")
+    
+    targets = set(user_ids)
+    result = await db.user_sessions.delete_many({"user_id": {"$in": list(targets)}})
+    await record_revocations(db, targets)
+    revoked_at = time.time()
+    purged = session_cache.revoke_users({target: revoked_at for target in targets})
+    logger.info(f"Admin {user_id} revoked {result.deleted_count} sessions for {len(targets)} users")
+    return {"users": len(targets), "sessions_revoked": result.deleted_count, "cache_entries_purged": purged}
+
 # ==================== SERVICE ROUTES ====================
 
 @api_router.post("/services")
 async def create_service(service_data: Dict[str, Any], user_id: str = Depends(require_auth)):
     service_obj = Service(creator_id=user_id, **service_data)
     service_dict = service_obj.model_dump()
-    service_dict["created_at"] = service_dict["created_at"].isoformat()
-    await db.services.insert_one(service_dict)
+    service_dict["min_price"] = tier_min_price(service_dict["tiers"])
+    await db.services.insert_one(service_dict.copy())
+    await apply_service_change(db, None, service_dict)
+    # service:{id} too, so its first reads come from the primary rather than a secondary that hasn't seen it
+    await response_cache.invalidate(f"service:{service_dict['service_id']}", *(["services:list"] if listed(service_dict) else []))
     return service_dict
 
 @api_router.get("/services")
@@ -229,44 +491,229 @@ async def list_services(
     category: Optional[str] = None,
     platform: Optional[str] = None,
     search: Optional[str] = None,
+    sort: str = "relevance",
+    cursor: Optional[str] = None,
     skip: int = 0,
+    limit: int = 20,
+    include_total: bool = False,
+    facets: bool = False,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    fields: Optional[str] = None
+):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    params = {
+        "category": category, "platform": platform, "search": search, "sort": sort,
+        "cursor": cursor, "skip": skip, "limit": limit, "include_total": include_total, "facets": facets,
+        "min_price": min_price, "max_price": max_price, "fields": fields
+    }
+    searching = bool(search and search.strip())
+    # Price order pages with skip, like relevance; the default newest-first order uses the keyset cursor
+    price_sort = PRICE_SORTS.get(sort)
+    base_projection = service_projection(fields)
+    
+    async def load():
+        source = await catalog_reader("services:list")
+        query = {"status": "active"}
+        if category:
+            query["category"] = category
+        if platform:
+            query["platform"] = platform
+        if min_price is not None or max_price is not None:
+            query["min_price"] = {}
+            if min_price is not None:
+                query["min_price"]["$gte"] = min_price
+            if max_price is not None:
+                query["min_price"]["$lte"] = max_price
+        
+        projection = dict(base_projection)
+        if searching:
+            # Uses the title/description text index; input is tokenized, never run as a regex.
+            # Relevance order has no stable key, so search results page with skip.
+            query["$text"] = {"$search": search.strip()}
+        
+        # Any filter beyond active status (category, platform, search, price range) needs live counts
+        if facets and query != {"status": "active"}:
+            return await load_services_with_facets(source, query)
+        
+        if searching:
+            projection["score"] = {"$meta": "textScore"}
+            if sort == "rating":
+                sort_spec = [("rating", -1), ("review_count", -1), ("score", {"$meta": "textScore"})]
+            else:
+                sort_spec = [("score", {"$meta": "textScore"}), ("rating", -1), ("review_count", -1)]
+            services = await source.services.find(query, projection).sort(sort_spec).skip(skip).limit(limit).to_list(length=limit)
+            next_page = None
+        elif price_sort:
+            services = await source.services.find(query, projection).sort(price_sort).skip(skip).limit(limit).to_list(length=limit)
+            next_page = None
+        else:
+            page_query = paged_query(query, cursor, "service_id")
+            find = source.services.find(page_query, projection).sort(keyset_sort("service_id"))
+            if not cursor:
+                find = find.skip(skip)
+            services = await find.limit(limit).to_list(length=limit)
+            next_page = next_cursor(services, limit, "service_id")
+        
+        result = {"services": services, "total": None, "next_cursor": next_page}
+        if facets:
+            # Unfiltered catalog: counts come from the incrementally maintained summary
+            summary = await get_catalog_summary(source)
+            result["facets"] = summary["facets"] if summary else None
+            if include_total and summary:
+                result["total"] = summary["total"]
+        if include_total and result["total"] is None:
+            result["total"] = await cached_count("services", query)
+        return result
+    
+    async def load_services_with_facets(source: DatabaseHandle, query: Dict[str, Any]):
+        """Page, total and per-facet counts for a filtered catalog in one $facet aggregation"""
+        if searching:
+            if sort == "rating":
+                sort_stage = {"rating": -1, "review_count": -1, "score": -1}
+            else:
+                sort_stage = {"score": -1, "rating": -1, "review_count": -1}
+            stages = [
+                {"$addFields": {"score": {"$meta": "textScore"}}},
+                {"$sort": sort_stage},
+                {"$skip": skip},
+            ]
+        elif price_sort:
+            stages = [{"$sort": dict(price_sort)}, {"$skip": skip}]
+        else:
+            stages = [{"$match": paged_query({}, cursor, "service_id")}] if cursor else []
+            stages.append({"$sort": dict(keyset_sort("service_id"))})
+            if not cursor:
+                stages.append({"$skip": skip})
+        projection = dict(base_projection)
+        if searching and len(projection) > 1:
+            projection["score"] = 1
+        stages += [{"$limit": limit}, {"$project": projection}]
+        
+        rows = await source.services.aggregate(facet_pipeline(query, stages)).to_list(length=1)
+        row = rows[0] if rows else {}
+        services = row.get("results", [])
+        return {
+            "services": services,
+            "total": row["total"][0]["n"] if row.get("total") else 0,
+            "next_cursor": None if searching or price_sort else next_cursor(services, limit, "service_id"),
+            "facets": format_facets(row)
+        }
+    
+    return ORJSONResponse(await response_cache.get_or_load("services:list", params, load))
+
+@api_router.get("/services/trending")
+async def get_trending_services(
+    category: Optional[str] = None,
+    platform: Optional[str] = None,
+    cursor: Optional[str] = None,
     limit: int = 20
 ):
-    query = {"status": "active"}
-    if category:
-        query["category"] = category
-    if platform:
-        query["platform"] = platform
-    if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
-        ]
-    
-    services = await db.services.find(query, {"_id": 0}).skip(skip).limit(limit).to_list(length=limit)
-    total = await db.services.count_documents(query)
-    return {"services": services, "total": total}
+    """Precomputed ranking for the whole catalog, one category or one platform"""
+    if category and platform:
+        raise HTTPException(status_code=400, detail="Trending feeds are per category or per platform, not both")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    feed = feed_name(category, platform)
+    
+    async def load():
+        query = paged_query({"feed": feed}, cursor, "service_id", "score")
+        source = await catalog_reader("trending")
+        find = source.trending_services.find(query, {"_id": 0, "feed": 0}).sort(keyset_sort("service_id", "score"))
+        services = await find.limit(limit).to_list(length=limit)
+        return {"services": services, "next_cursor": next_cursor(services, limit, "service_id", "score")}
+    
+    return ORJSONResponse(await response_cache.get_or_load("trending", {"feed": feed, "cursor": cursor, "limit": limit}, load))
 
 @api_router.get("/services/{service_id}")
 async def get_service(service_id: str):
-    service = await db.services.find_one({"service_id": service_id}, {"_id": 0})
+    namespace = f"service:{service_id}"
+    
+    async def load():
+        source = await catalog_reader(namespace)
+        return await source.services.find_one({"service_id": service_id}, {"_id": 0})
+    
+    service = await response_cache.get_or_load(namespace, {}, load)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
-    return service
+    return ORJSONResponse(service)
 
 @api_router.put("/services/{service_id}")
 async def update_service(service_id: str, updates: Dict[str, Any], user_id: str = Depends(require_auth)):
-    service = await db.services.find_one({"service_id": service_id, "creator_id": user_id}, {"_id": 0})
+    updates = validated_service_updates(updates, "Update")
+    # The pre-update values come from the write itself, so concurrent edits each see their own "old"
+    service = await db.services.find_one_and_update(
+        {"service_id": service_id, "creator_id": user_id},
+        {"$set": updates},
+        projection=SUMMARY_FIELDS,
+        return_document=ReturnDocument.BEFORE
+    )
     if not service:
         raise HTTPException(status_code=404, detail="Service not found or unauthorized")
     
-    await db.services.update_one({"service_id": service_id}, {"$set": updates})
+    updated = {**service, **updates}
+    if any(field in updates for field in ("status", "category", "platform")):
+        await apply_service_change(db, service, updated)
+    # edits to paused/deleted services leave every cached catalog page as it was
+    await response_cache.invalidate(f"service:{service_id}", *(["services:list"] if listed(service, updated) else []))
     return {"message": "Service updated"}
 
+@api_router.post("/services/batch-get")
+async def batch_get_services(payload: Dict[str, Any]):
+    """Many services in one $in query, as cards unless `fields` says otherwise; results follow the requested order"""
+    service_ids = batch_ids(payload, "service_ids")
+    fields = payload.get("fields")
+    projection = service_projection(fields if isinstance(fields, str) else None)
+    found = {
+        service["service_id"]: service
+        async for service in catalog_db.services.find({"service_id": {"$in": service_ids}}, projection)
+    }
+    results = [
+        {"service_id": sid, "outcome": Outcome.OK, "service": found[sid]} if sid in found
+        else {"service_id": sid, "outcome": Outcome.NOT_FOUND}
+        for sid in service_ids
+    ]
+    return ORJSONResponse({"results": results})
+
+@api_router.post("/services/batch-update")
+async def batch_update_services(payload: Dict[str, Any], user_id: str = Depends(require_auth)):
+    """Apply {"service_ids": [...], "set": {...}} to the caller's own services"""
+    service_ids = batch_ids(payload, "service_ids")
+    updates = validated_service_updates(payload.get("set"), "set")
+    
+    # One find_one_and_update per id, so each pre-update document is read by its own write
+    # (a separate find could hand two concurrent batches the same "old" values).
+    # Ownership is part of every filter; ids the caller doesn't own read as not found.
+    semaphore = asyncio.Semaphore(8)
+    
+    async def update_one(sid: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await db.services.find_one_and_update(
+                {"service_id": sid, "creator_id": user_id},
+                {"$set": updates},
+                projection=SUMMARY_FIELDS,
+                return_document=ReturnDocument.BEFORE
+            )
+    
+    befores = await asyncio.gather(*(update_one(sid) for sid in service_ids))
+    owned = {sid: old for sid, old in zip(service_ids, befores) if old}
+    if owned:
+        if any(field in updates for field in ("status", "category", "platform")):
+            await apply_service_changes(db, [(old, {**old, **updates}) for old in owned.values()])
+        shown = any(listed(old, {**old, **updates}) for old in owned.values())
+        await response_cache.invalidate(*(f"service:{sid}" for sid in owned), *(["services:list"] if shown else []))
+    
+    results = [{"service_id": sid, "outcome": Outcome.OK if sid in owned else Outcome.NOT_FOUND} for sid in service_ids]
+    return {"results": results, "updated": len(owned)}
+
 @api_router.get("/creator/services")
-async def get_creator_services(user_id: str = Depends(require_auth)):
-    services = await db.services.find({"creator_id": user_id}, {"_id": 0}).to_list(length=100)
-    return {"services": services}
+async def get_creator_services(fields: Optional[str] = None, user_id: str = Depends(require_auth)):
+    services = await db.services.find({"creator_id": user_id}, service_projection(fields)).to_list(length=100)
+    return ORJSONResponse({"services": services})
+
+@api_router.get("/creator/stats")
+async def get_creator_stats(user_id: str = Depends(require_auth)):
+    """Dashboard aggregates from the creator's incrementally maintained stats document"""
+    return ORJSONResponse(await creator_stats.get_creator_stats(db, user_id))
 
 # ==================== ORDER ROUTES ====================
 
@@ -293,12 +740,14 @@ async def create_order(order_data: Dict[str, Any], user_id: str = Depends(requir
         max_revisions=tier["revisions"]
     )
     order_dict = order_obj.model_dump()
-    order_dict["created_at"] = order_dict["created_at"].isoformat()
-    await db.orders.insert_one(order_dict)
+    await db.orders.insert_one(order_dict.copy())
+    await creator_stats.order_created(db, order_dict)
+    live.order_changed(order_dict)
     return order_dict
 
 @api_router.get("/orders")
-async def list_orders(user_id: str = Depends(require_auth)):
+async def list_orders(cursor: Optional[str] = None, limit: int = MAX_PAGE_SIZE, user_id: str = Depends(require_auth)):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
     user = await db.users.find_one({"user_id": user_id}, {"_id": 0})
     query = {}
     if user["user_type"] == "creator":
@@ -306,8 +755,9 @@ async def list_orders(user_id: str = Depends(require_auth)):
     else:
         query["client_id"] = user_id
     
-    orders = await db.orders.find(query, {"_id": 0}).sort("created_at", -1).to_list(length=100)
-    return {"orders": orders}
+    page_query = paged_query(query, cursor, "order_id")
+    orders = await db.orders.find(page_query, {"_id": 0}).sort(keyset_sort("order_id")).limit(limit).to_list(length=limit)
+    return ORJSONResponse({"orders": orders, "next_cursor": next_cursor(orders, limit, "order_id")})
 
 @api_router.get("/orders/{order_id}")
 async def get_order(order_id: str, user_id: str = Depends(require_auth)):
@@ -320,31 +770,51 @@ async def get_order(order_id: str, user_id: str = Depends(require_auth)):
     
     return order
 
+def raise_for_transition(result: TransitionResult, target: str) -> None:
+    if result.outcome == Outcome.INVALID:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {target}")
+    if result.outcome == Outcome.NOT_FOUND:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if result.outcome == Outcome.FORBIDDEN:
+        raise HTTPException(status_code=403, detail=f"Not allowed to set status {target}")
+    if result.outcome == Outcome.CONFLICT:
+        raise HTTPException(status_code=409, detail=f"Cannot move order from {result.current_status} to {target}")
+
 @api_router.put("/orders/{order_id}/status")
 async def update_order_status(order_id: str, status_data: Dict[str, str], user_id: str = Depends(require_auth)):
-    order = await db.orders.find_one({"order_id": order_id}, {"_id": 0})
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order["creator_id"] != user_id:
-        raise HTTPException(status_code=403, detail="Only creator can update status")
-    
-    await db.orders.update_one({"order_id": order_id}, {"$set": {"status": status_data["status"]}})
+    target = status_data.get("status", "")
+    result = await transition_order(db, order_id, target, user_id)
+    raise_for_transition(result, target)
+    live.order_changed(result.order)
     return {"message": "Status updated"}
 
+@api_router.post("/orders/batch-status")
+async def batch_update_order_status(payload: Dict[str, Any], user_id: str = Depends(require_auth)):
+    """Move many orders to one status; each item goes through the same guarded transition as a single update"""
+    order_ids = batch_ids(payload, "order_ids")
+    target = payload.get("status", "")
+    if target not in TRANSITIONS or not TRANSITIONS[target].actors & {CLIENT, CREATOR}:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {target}")
+    
+    outcomes = await transition_orders(db, order_ids, target, user_id)
+    results = []
+    for order_id, result in outcomes.items():
+        if result.ok:
+            live.order_changed(result.order)
+        item = {"order_id": order_id, "outcome": result.outcome}
+        if result.outcome == Outcome.CONFLICT:
+            item["current_status"] = result.current_status
+        results.append(item)
+    return {"results": results, "updated": sum(1 for r in outcomes.values() if r.ok)}
+
 @api_router.post("/orders/{order_id}/delivery")
 async def submit_delivery(order_id: str, delivery_data: Dict[str, Any], user_id: str = Depends(require_auth)):
-    order = await db.orders.find_one({"order_id": order_id}, {"_id": 0})
-    if not order or order["creator_id"] != user_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
-    
-    await db.orders.update_one(
-        {"order_id": order_id},
-        {"$set": {
-            "delivery_files": delivery_data.get("files", []),
-            "status": "submitted"
-        }}
+    result = await transition_order(
+        db, order_id, "submitted", user_id,
+        set_fields={"delivery_files": delivery_data.get("files", [])}
     )
+    raise_for_transition(result, "submitted")
+    live.order_changed(result.order)
     return {"message": "Delivery submitted"}
 
 # ==================== PAYMENT ROUTES ====================
@@ -352,7 +822,7 @@ async def submit_delivery(order_id: str, delivery_data: Dict[str, Any], user_id:
 @api_router.post("/payments/checkout")
 async def create_checkout(checkout_data: Dict[str, Any], request: Request, user_id: str = Depends(require_auth)):
     order_id = checkout_data.get("order_id")
-    order = await db.orders.find_one({"order_id": order_id, "client_id": user_id}, {"_id": 0})
+    order = await db.orders.find_one({"order_id": order_id, "client_id": user_id}, {"_id": 0, "price": 1, "status": 1, "creator_id": 1})
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -364,11 +834,10 @@ async def create_checkout(checkout_data: Dict[str, Any], request: Request, user_
     success_url = f"{origin}/order/{order_id}?session_id={{CHECKOUT_SESSION_ID}}"
     cancel_url = f"{origin}/order/{order_id}"
     
-    stripe_key = os.getenv('STRIPE_API_KEY')
     host_url = str(request.base_url)
     webhook_url = f"{host_url}api/webhook/stripe"
     
-    stripe_checkout = StripeCheckout(api_key=stripe_key, webhook_url=webhook_url)
+    stripe_checkout = outbound.stripe(webhook_url)
     
     checkout_request = CheckoutSessionRequest(
         amount=order["price"],
@@ -385,14 +854,14 @@ async def create_checkout(checkout_data: Dict[str, Any], request: Request, user_
         session_id=session.session_id,
         amount=order["price"],
         user_id=user_id,
+        creator_id=order["creator_id"],
         payment_status="initiated"
     )
     payment_dict = payment_tx.model_dump()
-    payment_dict["created_at"] = payment_dict["created_at"].isoformat()
-    payment_dict["updated_at"] = payment_dict["updated_at"].isoformat()
-    await db.payment_transactions.insert_one(payment_dict)
-    
-    await db.orders.update_one({"order_id": order_id}, {"$set": {"payment_session_id": session.session_id}})
+    if not await attach_payment_session(db, order_id, user_id, session.session_id):
+        raise HTTPException(status_code=409, detail="Order already paid")
+    await db.payment_transactions.insert_one(payment_dict.copy())
+    live.payment_changed(payment_dict, order["creator_id"])
     
     return {"url": session.url, "session_id": session.session_id}
 
@@ -405,22 +874,21 @@ async def check_payment_status(session_id: str, user_id: str = Depends(require_a
     if payment["payment_status"] == "completed":
         return payment
     
-    stripe_key = os.getenv('STRIPE_API_KEY')
-    stripe_checkout = StripeCheckout(api_key=stripe_key, webhook_url="")
+    stripe_checkout = outbound.stripe()
     
     try:
         status: CheckoutStatusResponse = await stripe_checkout.get_checkout_status(session_id)
         
-        if status.payment_status == "paid" and payment["payment_status"] != "completed":
+        if status.payment_status == "paid":
             await db.payment_transactions.update_one(
-                {"session_id": session_id},
-                {"$set": {"payment_status": "completed", "updated_at": datetime.now(timezone.utc).isoformat()}}
-            )
-            await db.orders.update_one(
-                {"order_id": payment["order_id"]},
-                {"$set": {"status": "paid"}}
+                {"session_id": session_id, "payment_status": {"$ne": "completed"}},
+                {"$set": {"payment_status": "completed", "updated_at": datetime.now(timezone.utc)}}
             )
+            # No-op if the webhook already moved the order past pending_payment
+            result = await mark_order_paid(db, payment["order_id"])
             payment["payment_status"] = "completed"
+            live.order_changed(result.order)
+            live.payment_changed(payment, result.order["creator_id"] if result.order else None)
         
         return payment
     except Exception as e:
@@ -431,25 +899,137 @@ async def stripe_webhook(request: Request):
     body = await request.body()
     stripe_signature = request.headers.get("Stripe-Signature")
     
-    stripe_key = os.getenv('STRIPE_API_KEY')
-    stripe_checkout = StripeCheckout(api_key=stripe_key, webhook_url="")
+    stripe_checkout = outbound.stripe()
     
     try:
         webhook_response = await stripe_checkout.handle_webhook(body, stripe_signature)
-        
-        if webhook_response.payment_status == "paid":
-            metadata = webhook_response.metadata
-            order_id = metadata.get("order_id")
-            
-            if order_id:
-                await db.orders.update_one(
-                    {"order_id": order_id},
-                    {"$set": {"status": "paid"}}
-                )
-        
-        return {"status": "success"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    # Ack as soon as the event is durably queued; webhook_queue workers apply it.
+    # A storage error is a 503 so Stripe redelivers rather than dropping the event.
+    try:
+        queued = await webhook_queue.enqueue(
+            webhook_response.event_id,
+            webhook_response.event_type,
+            webhook_response.session_id,
+            webhook_response.payment_status,
+            webhook_response.metadata
+        )
+    except PyMongoError as e:
+        logger.error(f"Failed to queue Stripe event {webhook_response.event_id}: {e}")
+        raise HTTPException(status_code=503, detail="Temporarily unavailable")
+    
+    return {"status": "success", "duplicate": not queued}
+
+# ==================== EXPORTS ====================
+
+async def export_scope(user_id: str, kind: str, creator_id: Optional[str]) -> Dict[str, Any]:
+    """Admins export everything (or one creator); creators their own sales; clients their own purchases."""
+    user = await db.users.find_one({"user_id": user_id}, {"_id": 0, "user_type": 1})
+    if user["user_type"] == "admin":
+        return {"creator_id": creator_id} if creator_id else {}
+    if creator_id and creator_id != user_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    if user["user_type"] == "creator":
+        return {"creator_id": user_id}
+    return {"client_id" if kind == "orders" else "user_id": user_id}
+
+@api_router.get("/exports/{kind}")
+async def export_records(
+    kind: str,
+    format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    creator_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    gzip: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    user_id: str = Depends(require_auth)
+):
+    """Stream every matching order or payment as NDJSON or CSV; start is inclusive, end exclusive"""
+    spec = EXPORTS.get(kind)
+    if spec is None:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    batch_size = max(1, min(batch_size, MAX_EXPORT_BATCH_SIZE))
+    
+    query = await export_scope(user_id, kind, creator_id)
+    if start or end:
+        query["created_at"] = {**({"$gte": start} if start else {}), **({"$lt": end} if end else {})}
+    query = paged_query(query, cursor, spec.id_field)
+    
+    # Exports tolerate replica lag, so the long scans stay off the primary
+    chunks = stream_export(catalog_db[spec.collection], spec, query, format, batch_size, header=not cursor)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{export_filename(kind, format, start, end)}"',
+        "Cache-Control": "no-store",
+    }
+    if gzip:
+        chunks = gzip_stream(chunks, int(os.getenv('GZIP_LEVEL', '6')))
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=FORMATS[format][0], headers=headers)
+
+# ==================== LIVE UPDATES ====================
+
+@api_router.get("/live/orders")
+async def stream_order_updates(
+    request: Request,
+    order_id: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    """Server-sent events for the caller's orders and payments. EventSource can't set headers, so
+    browsers authenticate with the session cookie (new EventSource(url, {withCredentials: true})).
+    There is deliberately no ?token= form: query strings end up in access logs."""
+    user_id = await get_user_from_session(authorization, request.cookies.get("session_token"))
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    subscription = live.broker.subscribe(user_id, order_id)
+    
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=LIVE_HEARTBEAT_SECONDS)
+                    yield format_sse(event)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+        finally:
+            live.broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.get("/admin/webhooks")
+async def get_webhook_queue_stats(user_id: str = Depends(require_admin)):
+    return await webhook_queue.stats()
+
+@api_router.get("/admin/trending")
+async def get_trending_stats(user_id: str = Depends(require_admin)):
+    return trending.stats()
+
+@api_router.post("/admin/trending/refresh")
+async def refresh_trending_feed(user_id: str = Depends(require_admin)):
+    return await trending.refresh_now()
+
+@api_router.post("/admin/catalog-summary/rebuild")
+async def rebuild_catalog_summary_route(dry_run: bool = False, user_id: str = Depends(require_admin)):
+    report = await rebuild_catalog_summary(db, apply=not dry_run)
+    if report["applied"]:
+        await response_cache.invalidate("services:list")
+    return report
+
+@api_router.get("/admin/live")
+async def get_live_stats(user_id: str = Depends(require_admin)):
+    return {"mode": live.mode, **live.broker.stats()}
 
 # ==================== REVIEW ROUTES ====================
 
@@ -473,27 +1053,37 @@ async def create_review(review_data: Dict[str, Any], user_id: str = Depends(requ
         comment=review_data.get("comment", "")
     )
     review_dict = review_obj.model_dump()
-    review_dict["created_at"] = review_dict["created_at"].isoformat()
-    await db.reviews.insert_one(review_dict)
-    
-    pipeline = [
-        {"$match": {"service_id": order["service_id"]}},
-        {"$group": {"_id": None, "avg_rating": {"$avg": "$rating"}, "count": {"$sum": 1}}}
-    ]
-    result = await db.reviews.aggregate(pipeline).to_list(length=1)
+    try:
+        await db.reviews.insert_one(review_dict.copy())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Already reviewed")
     
-    if result:
-        await db.services.update_one(
-            {"service_id": order["service_id"]},
-            {"$set": {"rating": round(result[0]["avg_rating"], 1), "review_count": result[0]["count"]}}
-        )
+    await db.services.update_one(
+        {"service_id": order["service_id"]},
+        add_rating_update(review_dict["rating"])
+    )
+    await creator_stats.review_added(db, order["creator_id"], review_dict["rating"])
+    await response_cache.invalidate(
+        f"service:{order['service_id']}", f"reviews:{order['service_id']}", "services:list"
+    )
     
     return review_dict
 
 @api_router.get("/services/{service_id}/reviews")
-async def get_service_reviews(service_id: str, skip: int = 0, limit: int = 10):
-    reviews = await db.reviews.find({"service_id": service_id}, {"_id": 0}).skip(skip).limit(limit).to_list(length=limit)
-    return {"reviews": reviews}
+async def get_service_reviews(service_id: str, cursor: Optional[str] = None, skip: int = 0, limit: int = 10):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    
+    async def load():
+        page_query = paged_query({"service_id": service_id}, cursor, "review_id")
+        source = await catalog_reader(f"reviews:{service_id}")
+        find = source.reviews.find(page_query, {"_id": 0}).sort(keyset_sort("review_id"))
+        if not cursor:
+            find = find.skip(skip)
+        reviews = await find.limit(limit).to_list(length=limit)
+        return {"reviews": reviews, "next_cursor": next_cursor(reviews, limit, "review_id")}
+    
+    params = {"cursor": cursor, "skip": skip, "limit": limit}
+    return ORJSONResponse(await response_cache.get_or_load(f"reviews:{service_id}", params, load))
 
 # ==================== CLOUDINARY UPLOAD ====================
 
@@ -514,6 +1104,25 @@ async def get_upload_signature(user_id: str = Depends(require_auth)):
         "api_key": os.getenv('CLOUDINARY_API_KEY', '')
     }
 
+# ==================== METRICS ====================
+
+def cache_metric_lines():
+    for name, stats in (("session_cache", session_cache.stats()), ("response_cache", response_cache.stats())):
+        for key in ("hits", "misses"):
+            yield from metrics.gauge_lines(f"{name}_{key}_total", f"{name} {key} since start.", stats[key], kind="counter")
+    live_stats = live.broker.stats()
+    yield from metrics.gauge_lines("live_subscriptions", "Open live update streams.", live_stats["subscriptions"])
+    yield from metrics.gauge_lines("live_dropped_events", "Events dropped for slow live subscribers.", live_stats["dropped"])
+
+metrics.add_collector(cache_metric_lines)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    metrics_token = os.getenv('METRICS_TOKEN')
+    if metrics_token and authorization != f"Bearer {metrics_token}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
 app.include_router(api_router)
 
 app.add_middleware(
@@ -524,12 +1133,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Wraps CORS; MetricsMiddleware (added last, outermost) records the final 304/200
+app.add_middleware(
+    ETagCompressionMiddleware,
+    path_prefixes=("/api/services",),
+    minimum_size=int(os.getenv('COMPRESS_MIN_BYTES', '1024')),
+    gzip_level=int(os.getenv('GZIP_LEVEL', '6')),
+    brotli_quality=int(os.getenv('BROTLI_QUALITY', '5'))
+)
+
+app.add_middleware(
+    MetricsMiddleware,
+    router=app.router,
+    slow_request_ms=float(os.getenv('SLOW_REQUEST_MS', '0'))
+)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
@@ -0,0 +1,149 @@
+from cachetools import TLRUCache
+from datetime import datetime, timedelta, timezone
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from typing import Dict, Iterable, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class SessionCache:
+    """Bounded LRU+TTL cache of session_token -> user_id.
+
+    Entries live for at most `ttl` seconds and never outlive the session's own
+    expires_at. Unknown or expired tokens are cached as None for `negative_ttl`
+    seconds so bad tokens don't reach Mongo on every request. The cache is per
+    process; RevocationFeed carries logouts and revocations from other workers.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, negative_ttl: float = 5.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._revoked: Dict[str, float] = {}  # user_id -> when its sessions were revoked (epoch seconds)
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._ttu, timer=time.monotonic)
+
+    def _ttu(self, token: str, value: Tuple[Optional[str], Optional[float]], now: float) -> float:
+        user_id, expires_ts = value
+        if user_id is None:
+            return now + self.negative_ttl
+        remaining = self.ttl
+        if expires_ts is not None:
+            remaining = min(remaining, expires_ts - time.time())
+        return now + remaining
+
+    def get(self, token: str) -> Tuple[bool, Optional[str]]:
+        """Return (found, user_id); user_id is None for a cached negative lookup."""
+        value = self._cache.get(token)
+        if value is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, value[0]
+
+    def set(self, token: str, user_id: Optional[str], expires_at: Optional[datetime] = None,
+            read_at: Optional[float] = None) -> None:
+        """Cache a lookup; `read_at` (epoch seconds) is when the session was read from Mongo."""
+        if user_id is not None and read_at is not None and read_at <= self._revoked.get(user_id, 0):
+            return  # read before a revocation that has since been applied here
+        expires_ts = expires_at.timestamp() if expires_at else None
+        if expires_ts is not None and expires_ts <= time.time():
+            user_id, expires_ts = None, None
+        self._cache[token] = (user_id, expires_ts)
+
+    def invalidate(self, token: str) -> None:
+        self._cache.pop(token, None)
+
+    def invalidate_user(self, user_id: str) -> None:
+        self.invalidate_users({user_id})
+
+    def invalidate_users(self, user_ids: Set[str]) -> int:
+        """Drop every cached token belonging to `user_ids` in one pass; returns how many."""
+        stale = [token for token, value in list(self._cache.items()) if value[0] in user_ids]
+        for token in stale:
+            self._cache.pop(token, None)
+        return len(stale)
+
+    def revoke_users(self, revoked: Dict[str, float]) -> int:
+        """invalidate_users, also refusing lookups for these users read before their revocation."""
+        horizon = time.time() - self.ttl
+        self._revoked = {user_id: ts for user_id, ts in self._revoked.items() if ts > horizon}
+        for user_id, ts in revoked.items():
+            self._revoked[user_id] = max(ts, self._revoked.get(user_id, 0))
+        return self.invalidate_users(set(revoked))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        self._cache.expire()
+        total = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+def parse_expires_at(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+# ==================== CROSS-WORKER REVOCATION ====================
+# Logout and admin revocation record the users in session_revocations
+# (_id = user_id). Every worker polls it and drops those users' cached tokens,
+# so a revoked session stops working everywhere within `interval` seconds
+# instead of SESSION_CACHE_TTL.
+
+async def record_revocations(db: AsyncIOMotorDatabase, user_ids: Iterable[str]) -> None:
+    now = datetime.now(timezone.utc)
+    await db.session_revocations.bulk_write(
+        [UpdateOne({"_id": user_id}, {"$set": {"revoked_at": now}}, upsert=True) for user_id in user_ids],
+        ordered=False
+    )
+
+class RevocationFeed:
+    def __init__(self, db: AsyncIOMotorDatabase, cache: SessionCache, interval: float = 2.0, overlap: float = 5.0):
+        self.db = db
+        self.cache = cache
+        self.interval = interval
+        self.overlap = overlap  # re-read this far back, for writers whose clocks run behind ours
+        self._since = datetime.now(timezone.utc)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        # the cache starts empty, so only revocations from now on matter
+        self._since = datetime.now(timezone.utc) - timedelta(seconds=self.overlap)
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def poll(self) -> int:
+        started = datetime.now(timezone.utc)
+        revoked = {
+            doc["_id"]: doc["revoked_at"].replace(tzinfo=timezone.utc).timestamp()
+            async for doc in self.db.session_revocations.find({"revoked_at": {"$gte": self._since}})
+        }
+        self._since = started - timedelta(seconds=self.overlap)
+        return self.cache.revoke_users(revoked) if revoked else 0
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except PyMongoError as e:
+                logger.warning(f"Session revocation poll failed: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# server modules are imported flat, as uvicorn runs them from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,150 @@
+import asyncio
+import copy
+from typing import Any, Dict, List
+
+from catalog_facets import (
+    DRIFT_ID, SUMMARY_ID, apply_service_changes, rebuild_catalog_summary, repair_catalog_summary, summary_drift,
+)
+
+def service(status: str = "active", category: str = "thumbnails", platform: str = "youtube") -> Dict[str, Any]:
+    return {"status": status, "category": category, "platform": platform}
+
+class FakeServices:
+    """aggregate() evaluates facet_pipeline's $match/$facet over in-memory docs."""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        match = pipeline[0]["$match"]
+        docs = [doc for doc in self.docs if all(doc.get(k) == v for k, v in match.items())]
+        row: Dict[str, Any] = {"total": [{"n": len(docs)}] if docs else []}
+        for name in ("category", "platform"):
+            counts: Dict[Any, int] = {}
+            for doc in docs:
+                counts[doc.get(name)] = counts.get(doc.get(name), 0) + 1
+            row[name] = [{"_id": value, "count": n} for value, n in counts.items()]
+
+        class Cursor:
+            async def to_list(self, length=None):
+                return [row]
+        return Cursor()
+
+class FakeSummary:
+    def __init__(self):
+        self.docs: Dict[str, Dict[str, Any]] = {}
+
+    async def find_one(self, query, projection=None):
+        doc = self.docs.get(query["_id"])
+        return copy.deepcopy(doc) if doc else None
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = {"_id": query["_id"], **copy.deepcopy(doc)}
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        for path, delta in update["$inc"].items():
+            *parents, leaf = path.split(".")
+            target = doc
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = target.get(leaf, 0) + delta
+
+class FakeDB:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.services = FakeServices(docs)
+        self.catalog_summary = FakeSummary()
+
+def summary(db: FakeDB) -> Dict[str, Any]:
+    return db.catalog_summary.docs[SUMMARY_ID]
+
+def test_summary_drift():
+    stored = {"total": 3, "category": {"thumbnails": 2, "editing": 1}, "platform": {"youtube": 3}}
+    rebuilt = {"total": 2, "category": {"thumbnails": 2, "scripts": 1}, "platform": {"youtube": 2}}
+
+    assert summary_drift(stored, rebuilt) == {"total": 1, "category.editing": 1, "category.scripts": -1, "platform.youtube": 1}
+    assert summary_drift(stored, stored) == {}
+    assert summary_drift(None, rebuilt) == {"total": -2, "category.thumbnails": -2, "category.scripts": -1, "platform.youtube": -2}
+
+def test_apply_service_changes_folds_into_one_inc():
+    db = FakeDB([])
+    asyncio.run(apply_service_changes(db, [
+        (None, service()),                                            # created
+        (service(), service(category="editing")),                     # recategorized
+        (service(), service(status="paused")),                        # taken down
+        (service(status="paused"), service(status="paused", platform="tiktok")),  # not listed either way
+        (None, service(category="bad.path")),                         # counted in total only
+    ]))
+
+    assert summary(db) == {
+        "_id": SUMMARY_ID, "total": 1,
+        "category": {"thumbnails": -1, "editing": 1},
+        "platform": {"youtube": 1},
+    }
+
+def test_apply_service_changes_skips_noop_writes():
+    db = FakeDB([])
+    asyncio.run(apply_service_changes(db, [(service(), service())]))
+
+    assert db.catalog_summary.docs == {}
+
+def test_rebuild_keeps_concurrent_increments():
+    db = FakeDB([service(), service(category="editing")])
+    asyncio.run(rebuild_catalog_summary(db))
+    summary(db)["total"] = 5
+    read_summary = db.catalog_summary.find_one
+
+    async def find_one_then_create(query, projection=None):
+        # a create lands between the rebuild's read of the summary and its correction
+        stored = await read_summary(query, projection)
+        db.services.docs.append(service(platform="tiktok"))
+        await apply_service_changes(db, [(None, service(platform="tiktok"))])
+        db.catalog_summary.find_one = read_summary
+        return stored
+
+    db.catalog_summary.find_one = find_one_then_create
+    report = asyncio.run(rebuild_catalog_summary(db))
+
+    assert report["corrected"] == {"total": 3}
+    assert summary(db)["total"] == 3
+    assert summary(db)["platform"] == {"youtube": 2, "tiktok": 1}
+
+def test_dry_run_reports_without_writing():
+    db = FakeDB([service()])
+    asyncio.run(rebuild_catalog_summary(db))
+    db.catalog_summary.docs[SUMMARY_ID]["total"] = 7
+
+    report = asyncio.run(rebuild_catalog_summary(db, apply=False))
+    assert report["drift"] == {"total": 6}
+    assert not report["applied"]
+    assert summary(db)["total"] == 7
+
+def test_repair_waits_for_drift_to_repeat():
+    db = FakeDB([service(), service()])
+    asyncio.run(rebuild_catalog_summary(db))
+    summary(db)["total"] = 4
+
+    first = asyncio.run(repair_catalog_summary(db))
+    assert not first["applied"]
+    assert db.catalog_summary.docs[DRIFT_ID]["drift"] == [["total", 2]]
+
+    second = asyncio.run(repair_catalog_summary(db))
+    assert second["corrected"] == {"total": 2}
+    assert summary(db)["total"] == 2
+    assert db.catalog_summary.docs[DRIFT_ID]["drift"] == []
+
+def test_repair_ignores_drift_that_went_away():
+    db = FakeDB([service()])
+    asyncio.run(rebuild_catalog_summary(db))
+    # a create whose summary $inc landed before the recount could see its insert
+    asyncio.run(apply_service_changes(db, [(None, service())]))
+
+    first = asyncio.run(repair_catalog_summary(db))
+    db.services.docs.append(service())
+    second = asyncio.run(repair_catalog_summary(db))
+
+    assert first["drift"] == {"total": 1, "category.thumbnails": 1, "platform.youtube": 1}
+    assert not first["applied"] and not second["applied"]
+    assert second["drift"] == {}
+    assert summary(db)["total"] == 2
+    assert db.catalog_summary.docs[DRIFT_ID]["drift"] == []
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pytest
+
+from creator_stats import order_stats_pipeline, transition_inc
+
+# ---------- a small evaluator for the operators order_stats_pipeline uses ----------
+
+def evaluate(expr: Any, doc: Dict[str, Any]) -> Any:
+    if isinstance(expr, str) and expr.startswith("$"):
+        value: Any = doc
+        for part in expr[1:].split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+    if isinstance(expr, list):
+        return [evaluate(item, doc) for item in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if len(expr) != 1 or not next(iter(expr)).startswith("$"):
+        return {key: evaluate(value, doc) for key, value in expr.items()}
+    (op, args), = expr.items()
+    if op == "$cond":
+        condition, then, otherwise = args
+        return evaluate(then if evaluate(condition, doc) else otherwise, doc)
+    if op == "$ifNull":
+        value = evaluate(args[0], doc)
+        return evaluate(args[1], doc) if value is None else value
+    if op == "$and":
+        return all(evaluate(arg, doc) for arg in args)
+    values = evaluate(args, doc)
+    if op == "$in":
+        return values[0] in values[1]
+    if op == "$eq":
+        return values[0] == values[1]
+    if op == "$type":
+        return "date" if isinstance(values, datetime) else "missing" if values is None else type(values).__name__
+    if op == "$subtract":
+        return (values[0] - values[1]) / timedelta(milliseconds=1)
+    if op == "$divide":
+        return values[0] / values[1]
+    if op == "$arrayToObject":
+        return {item["k"]: item["v"] for item in values}
+    raise NotImplementedError(op)
+
+def run_pipeline(pipeline: List[Dict[str, Any]], docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$group":
+            groups: Dict[Any, Dict[str, Any]] = {}
+            for doc in docs:
+                key = evaluate(spec["_id"], doc)
+                group = groups.setdefault(repr(key), {"_id": key})
+                for field, accumulator in spec.items():
+                    if field == "_id":
+                        continue
+                    (op, arg), = accumulator.items()
+                    if op == "$sum":
+                        group[field] = group.get(field, 0) + evaluate(arg, doc)
+                    else:  # $push
+                        group.setdefault(field, []).append(evaluate(arg, doc))
+            docs = list(groups.values())
+        elif name == "$set":
+            docs = [{**doc, **{field: evaluate(expr, doc) for field, expr in spec.items()}} for doc in docs]
+        elif name == "$unset":
+            docs = [{k: v for k, v in doc.items() if k != spec} for doc in docs]
+        else:
+            raise NotImplementedError(name)
+    return docs
+
+# ---------- incremental counters, as order_state drives them ----------
+
+def apply_inc(stats: Dict[str, Any], inc: Dict[str, float]) -> None:
+    for path, delta in inc.items():
+        *parents, leaf = path.split(".")
+        target = stats
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = target.get(leaf, 0) + delta
+
+START = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+def lifecycle(stats: Dict[str, Any], order: Dict[str, Any], path: List[str]) -> Dict[str, Any]:
+    apply_inc(stats, {"orders_total": 1, f"by_status.{order['status']}": 1})
+    for hour, target in enumerate(path, start=1):
+        after = {**order, "status": target}
+        if target == "paid":
+            after["paid_at"] = START + timedelta(hours=hour)
+        if target == "completed":
+            after["completed_at"] = START + timedelta(hours=hour * 10)
+        if target == "revision_requested":
+            after["revision_count"] = order.get("revision_count", 0) + 1
+        apply_inc(stats, transition_inc(order, after))
+        order = after
+    return order
+
+PATHS = [
+    [],
+    ["cancelled"],
+    ["paid", "cancelled"],
+    ["paid", "in_progress"],
+    ["paid", "submitted", "completed"],
+    ["paid", "in_progress", "submitted", "revision_requested", "in_progress", "submitted", "completed"],
+    ["paid", "submitted", "revision_requested", "submitted", "revision_requested"],
+]
+
+@pytest.mark.parametrize("paths", [PATHS, PATHS[4:6], [PATHS[0]]])
+def test_incremental_counters_match_rebuild(paths):
+    stats: Dict[str, Any] = {}
+    orders = []
+    for i, path in enumerate(paths):
+        order = {
+            "order_id": f"ord_{i}", "creator_id": "user_creator", "status": "pending_payment",
+            "price": 25.0 + i, "revision_count": 0, "max_revisions": 2, "created_at": START,
+        }
+        orders.append(lifecycle(stats, order, path))
+
+    rebuilt, = run_pipeline(order_stats_pipeline(), orders)
+    stats["by_status"] = {status: n for status, n in stats["by_status"].items() if n}
+
+    for field in ("orders_total", "by_status", "paid_orders", "completed", "revision_requests",
+                  "revisions_used_sum", "revisions_allowed_sum", "turnaround_count"):
+        assert stats.get(field, 0) == rebuilt[field], field
+    assert stats.get("revenue", 0) == pytest.approx(rebuilt["revenue"])
+    assert stats.get("turnaround_seconds_sum", 0) == pytest.approx(rebuilt["turnaround_seconds_sum"])
+
+def test_unpaid_exit_reverses_revenue():
+    inc = transition_inc({"status": "paid"}, {"status": "cancelled", "price": 40.0})
+
+    assert inc == {"by_status.paid": -1, "by_status.cancelled": 1, "paid_orders": -1, "revenue": -40.0}
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Dict, List, Set
+
+from pymongo.errors import OperationFailure
+
+import db_indexes
+from db_indexes import INDEXES, SUPERSEDED, ensure_indexes
+
+class FakeCollection:
+    def __init__(self, existing: Set[str], failing: Set[str]):
+        self.indexes = set(existing) | {"_id_"}
+        self.failing = failing
+        self.dropped: List[str] = []
+
+    async def create_indexes(self, indexes) -> List[str]:
+        names = [index.document["name"] for index in indexes]
+        if any(name in self.failing for name in names):
+            raise OperationFailure("E11000 duplicate key error", code=11000)
+        self.indexes.update(names)
+        return names
+
+    async def index_information(self) -> Dict[str, Any]:
+        return {name: {} for name in self.indexes}
+
+    async def drop_index(self, name: str) -> None:
+        self.indexes.discard(name)
+        self.dropped.append(name)
+
+class FakeDB:
+    def __init__(self, existing: Dict[str, Set[str]], failing: Dict[str, Set[str]]):
+        self.collections = {
+            name: FakeCollection(existing.get(name, set()), failing.get(name, set()))
+            for name in set(INDEXES) | set(SUPERSEDED)
+        }
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.collections[name]
+
+def test_failed_unique_index_keeps_the_rest_and_the_superseded_ones():
+    old = set(SUPERSEDED["orders"])
+    db = FakeDB(existing={"orders": old}, failing={"orders": {"order_id_unique"}})
+    asyncio.run(ensure_indexes(db))
+
+    orders = db["orders"]
+    expected = {index.document["name"] for index in INDEXES["orders"]} - {"order_id_unique"}
+    assert expected <= orders.indexes
+    assert set(orders.dropped) == old
+    assert not old & orders.indexes
+
+def test_superseded_index_kept_until_replacement_exists():
+    replacement = SUPERSEDED["orders"]["client_id_created_at"]
+    db = FakeDB(existing={"orders": {"client_id_created_at"}}, failing={"orders": {replacement}})
+    asyncio.run(ensure_indexes(db))
+
+    assert "client_id_created_at" in db["orders"].indexes
+    assert db["orders"].dropped == []
+
+def test_superseded_replacements_are_registered():
+    for collection, replaced in SUPERSEDED.items():
+        names = {index.document["name"] for index in db_indexes.INDEXES[collection]}
+        assert set(replaced.values()) <= names
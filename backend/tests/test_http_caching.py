@@ -0,0 +1,100 @@
+import asyncio
+import gzip
+
+import pytest
+
+import http_caching
+from http_caching import ETagCompressionMiddleware, choose_encoding, etag_matches
+
+ETAG = 'W/"abc123"'
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('W/"abc123"', True),
+    ('"abc123"', True),  # weak comparison ignores the W/ prefix
+    ('"other", W/"abc123"', True),
+    ("*", True),
+    ('W/"abc1234"', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, ETAG) is expected
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0.5, br;q=0", "gzip"),
+    ("identity", None),
+    ("gzip;q=bogus", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(http_caching, "brotli", None)
+    assert choose_encoding("br, gzip") == "gzip"
+    assert choose_encoding("br") is None
+
+def json_app(body: bytes, status: int = 200):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+def request(middleware, path: str = "/api/services", **headers):
+    scope = {
+        "type": "http", "method": "GET", "path": path,
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    }
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, None, send))
+    start, body = sent
+    return start["status"], dict(start["headers"]), body["body"]
+
+BODY = b'{"services": [' + b'{"title": "Thumbnail design"},' * 100 + b'{}]}'
+
+def test_revalidation_returns_304_without_body():
+    middleware = ETagCompressionMiddleware(json_app(BODY), ("/api/services",))
+    status, headers, _ = request(middleware)
+    etag = headers[b"etag"].decode()
+
+    status, headers, body = request(middleware, if_none_match=etag)
+    assert status == 304
+    assert body == b""
+    assert headers[b"etag"].decode() == etag
+    assert b"content-type" not in headers
+
+def test_changed_body_gets_200():
+    status, headers, _ = request(ETagCompressionMiddleware(json_app(BODY), ("/api/services",)))
+    changed = ETagCompressionMiddleware(json_app(BODY + b" "), ("/api/services",))
+
+    status, _, body = request(changed, if_none_match=headers[b"etag"].decode())
+    assert status == 200
+    assert body == BODY + b" "
+
+def test_compresses_large_bodies_only():
+    large = request(ETagCompressionMiddleware(json_app(BODY), ("/api/services",)), accept_encoding="gzip")
+    small = request(ETagCompressionMiddleware(json_app(b"{}"), ("/api/services",)), accept_encoding="gzip")
+
+    status, headers, body = large
+    assert headers[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(body) == BODY
+    assert headers[b"content-length"] == str(len(body)).encode()
+    assert b"content-encoding" not in small[1]
+
+def test_other_paths_and_errors_pass_through():
+    untouched = request(ETagCompressionMiddleware(json_app(BODY), ("/api/services",)), path="/api/orders", accept_encoding="gzip")
+    not_found = request(ETagCompressionMiddleware(json_app(BODY, status=404), ("/api/services",)), accept_encoding="gzip")
+
+    for status, headers, body in (untouched, not_found):
+        assert b"etag" not in headers
+        assert body == BODY
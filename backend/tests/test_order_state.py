@@ -0,0 +1,180 @@
+import asyncio
+import copy
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from order_state import CLIENT, CREATOR, SYSTEM, TRANSITIONS, Outcome, mark_order_paid, mark_orders_paid, transition_order, transition_orders
+
+STATUSES = ["pending_payment", "paid", "in_progress", "submitted", "revision_requested", "completed", "cancelled"]
+
+# (target, from state, actor) triples the state machine must accept; everything else is refused
+ALLOWED = {
+    ("paid", "pending_payment", SYSTEM),
+    ("in_progress", "paid", CREATOR),
+    ("in_progress", "revision_requested", CREATOR),
+    ("submitted", "paid", CREATOR),
+    ("submitted", "in_progress", CREATOR),
+    ("submitted", "revision_requested", CREATOR),
+    ("revision_requested", "submitted", CLIENT),
+    ("completed", "submitted", CLIENT),
+    ("completed", "submitted", CREATOR),
+    ("cancelled", "pending_payment", CLIENT),
+    ("cancelled", "pending_payment", CREATOR),
+    ("cancelled", "paid", CLIENT),
+    ("cancelled", "paid", CREATOR),
+}
+
+USERS = {CLIENT: "user_client", CREATOR: "user_creator", SYSTEM: None, "stranger": "user_stranger"}
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, clause) for clause in cond):
+                return False
+        elif key == "$expr":
+            left, right = cond["$lt"]
+            if not doc.get(left[1:], 0) < doc.get(right[1:], 0):
+                return False
+        elif isinstance(cond, dict) and "$in" in cond:
+            if doc.get(key) not in cond["$in"]:
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+class FakeOrders:
+    """The two collection calls order_state makes, over an in-memory dict."""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = {doc["order_id"]: doc for doc in docs}
+
+    async def find_one(self, query: Dict[str, Any], projection: Optional[Dict[str, Any]] = None):
+        for doc in self.docs.values():
+            if _matches(doc, query):
+                return copy.deepcopy(doc)
+        return None
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        for doc in self.docs.values():
+            if _matches(doc, query):
+                before = copy.deepcopy(doc)
+                doc.update(update.get("$set", {}))
+                for field, delta in update.get("$inc", {}).items():
+                    doc[field] = doc.get(field, 0) + delta
+                return before
+        return None
+
+class FakeCollection:
+    def __init__(self):
+        self.updates: List[Any] = []
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append((query, update))
+
+    async def bulk_write(self, ops, ordered=True):
+        self.updates.extend((op._filter, op._doc) for op in ops)
+
+class FakeDB:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.orders = FakeOrders(docs)
+        self.creator_stats = FakeCollection()
+
+def make_order(status: str, order_id: str = "ord_1") -> Dict[str, Any]:
+    return {
+        "order_id": order_id, "client_id": USERS[CLIENT], "creator_id": USERS[CREATOR], "status": status,
+        "price": 50.0, "revision_count": 0, "max_revisions": 2,
+    }
+
+def expected(target: str, from_state: str, actor: str) -> Outcome:
+    if (target, from_state, actor) in ALLOWED:
+        return Outcome.OK
+    actors = TRANSITIONS[target].actors
+    if actor == SYSTEM:
+        return Outcome.CONFLICT if SYSTEM in actors else Outcome.INVALID
+    if actors == {SYSTEM}:
+        return Outcome.FORBIDDEN
+    if actor == "stranger":
+        return Outcome.NOT_FOUND
+    if actor not in actors:
+        return Outcome.FORBIDDEN
+    return Outcome.CONFLICT
+
+@pytest.mark.parametrize("actor", list(USERS))
+@pytest.mark.parametrize("from_state", STATUSES)
+@pytest.mark.parametrize("target", list(TRANSITIONS))
+def test_transition_matrix(target, from_state, actor):
+    db = FakeDB([make_order(from_state)])
+    result = asyncio.run(transition_order(db, "ord_1", target, USERS[actor]))
+
+    assert result.outcome == expected(target, from_state, actor)
+    status = db.orders.docs["ord_1"]["status"]
+    assert status == (target if result.ok else from_state)
+    assert len(db.creator_stats.updates) == (1 if result.ok else 0)
+
+@pytest.mark.parametrize("actor", [CLIENT, CREATOR, "stranger"])
+def test_user_cannot_set_paid(actor):
+    db = FakeDB([make_order("pending_payment")])
+    result = asyncio.run(transition_order(db, "ord_1", "paid", USERS[actor]))
+
+    assert result.outcome == Outcome.FORBIDDEN
+    assert db.orders.docs["ord_1"]["status"] == "pending_payment"
+
+def test_mark_order_paid_sets_paid_at():
+    db = FakeDB([make_order("pending_payment")])
+    result = asyncio.run(mark_order_paid(db, "ord_1"))
+
+    assert result.ok
+    assert db.orders.docs["ord_1"]["paid_at"] is not None
+
+def test_mark_orders_paid_counts_each_order_once():
+    db = FakeDB([make_order("pending_payment", "ord_0"), make_order("pending_payment", "ord_1"), make_order("cancelled", "ord_2")])
+    first = asyncio.run(mark_orders_paid(db, ["ord_0", "ord_1", "ord_2", "ord_missing"]))
+    redelivered = asyncio.run(mark_orders_paid(db, ["ord_0", "ord_1"]))
+
+    assert sorted(order["order_id"] for order in first) == ["ord_0", "ord_1"]
+    assert redelivered == []
+    assert [doc["status"] for doc in db.orders.docs.values()] == ["paid", "paid", "cancelled"]
+    assert "payment_event_id" not in db.orders.docs["ord_0"]
+    (creator, update), = db.creator_stats.updates
+    assert creator == {"_id": USERS[CREATOR]}
+    assert update["$inc"]["paid_orders"] == 2
+
+def test_revision_limit():
+    order = make_order("submitted")
+    order["revision_count"] = order["max_revisions"]
+    db = FakeDB([order])
+    result = asyncio.run(transition_order(db, "ord_1", "revision_requested", USERS[CLIENT]))
+
+    assert result.outcome == Outcome.CONFLICT
+    assert db.orders.docs["ord_1"]["revision_count"] == order["max_revisions"]
+
+def test_unknown_order():
+    db = FakeDB([])
+    result = asyncio.run(transition_order(db, "ord_missing", "completed", USERS[CLIENT]))
+
+    assert result.outcome == Outcome.NOT_FOUND
+
+def test_batch_items_outcomes():
+    db = FakeDB([
+        make_order("in_progress", "ord_mine"),
+        {**make_order("in_progress", "ord_other"), "creator_id": "user_other_creator"},
+        make_order("completed", "ord_done"),
+    ])
+    results = asyncio.run(transition_orders(db, ["ord_mine", "ord_other", "ord_done", "ord_missing"], "submitted", USERS[CREATOR]))
+
+    assert {order_id: result.outcome for order_id, result in results.items()} == {
+        "ord_mine": Outcome.OK,
+        "ord_other": Outcome.NOT_FOUND,
+        "ord_done": Outcome.CONFLICT,
+        "ord_missing": Outcome.NOT_FOUND,
+    }
+
+def test_batch_items_forbidden():
+    db = FakeDB([make_order("pending_payment", f"ord_{i}") for i in range(3)])
+    paid = asyncio.run(transition_orders(db, list(db.orders.docs), "paid", USERS[CLIENT]))
+    revision = asyncio.run(transition_orders(db, ["ord_0"], "revision_requested", USERS[CREATOR]))
+
+    assert all(result.outcome == Outcome.FORBIDDEN for result in paid.values())
+    assert revision["ord_0"].outcome == Outcome.FORBIDDEN
+    assert all(doc["status"] == "pending_payment" for doc in db.orders.docs.values())
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, keyset_query
+
+def forge(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def test_round_trip_datetime():
+    doc = {"created_at": datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc), "order_id": "ord_1"}
+    assert decode_cursor(encode_cursor(doc, "order_id")) == (doc["created_at"], "ord_1")
+
+def test_round_trip_score():
+    doc = {"score": 2.75, "service_id": "svc_1"}
+    assert decode_cursor(encode_cursor(doc, "service_id", "score")) == (2.75, "svc_1")
+
+@pytest.mark.parametrize("payload", [
+    {"s": {"$ne": None}, "i": "x"},
+    {"s": ["a"], "i": "x"},
+    {"s": None, "i": "x"},
+    {"s": True, "i": "x"},
+    {"s": 1},
+    {"d": "not a date", "i": "x"},
+    ["s", "i"],
+])
+def test_rejects_forged_values(payload):
+    with pytest.raises(ValueError):
+        decode_cursor(forge(payload))
+
+def test_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("!!not-base64!!")
+
+def test_keyset_query_wraps_existing_or():
+    cursor = encode_cursor({"created_at": datetime(2026, 3, 1, tzinfo=timezone.utc), "review_id": "rev_1"}, "review_id")
+    query = keyset_query({"$or": [{"a": 1}, {"b": 2}]}, cursor, "review_id")
+    assert list(query) == ["$and"]
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+import response_cache
+from response_cache import MemoryBackend, ResponseCache
+
+class Loader:
+    """Counts calls; each call waits on `release` so tests can pile up concurrent misses."""
+
+    def __init__(self, value=None):
+        self.value = {"services": []} if value is None else value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+def test_concurrent_misses_share_one_load():
+    async def run():
+        cache = ResponseCache(MemoryBackend())
+        loader = Loader()
+        tasks = [asyncio.create_task(cache.get_or_load("services:list", {"limit": 20}, loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*tasks)
+        return cache, loader, results
+
+    cache, loader, results = asyncio.run(run())
+    assert loader.calls == 1
+    assert all(result == {"services": []} for result in results)
+    assert cache.stats()["coalesced"] == 4
+    assert cache.stats()["inflight"] == 0
+
+def test_invalidate_bumps_generation():
+    async def run():
+        cache = ResponseCache(MemoryBackend())
+        loader = Loader()
+        loader.release.set()
+        await cache.get_or_load("services:list", {}, loader)
+        await cache.get_or_load("services:list", {}, loader)
+        await cache.invalidate("services:list")
+        await cache.get_or_load("services:list", {}, loader)
+        await cache.get_or_load("trending", {}, loader)
+        return loader
+
+    assert asyncio.run(run()).calls == 3
+
+def test_params_normalized():
+    assert ResponseCache.normalize({"search": " edit ", "cursor": None}) == ResponseCache.normalize({"search": "edit", "category": ""})
+
+def test_cancelled_leader_does_not_fail_waiters():
+    async def run():
+        cache = ResponseCache(MemoryBackend())
+        loader = Loader()
+        leader = asyncio.create_task(cache.get_or_load("services:list", {}, loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load("services:list", {}, loader))
+        await asyncio.sleep(0)
+        leader.cancel()  # e.g. the first client disconnected
+        await asyncio.sleep(0)
+        loader.release.set()
+        value = await waiter
+        cached = await cache.get_or_load("services:list", {}, loader)
+        return leader, loader, value, cached
+
+    leader, loader, value, cached = asyncio.run(run())
+    assert leader.cancelled()
+    assert value == cached == {"services": []}
+    assert loader.calls == 1
+
+def test_missing_results_are_cached_briefly():
+    async def run():
+        cache = ResponseCache(MemoryBackend(negative_ttl=5))
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            return None
+
+        first = await cache.get_or_load("service:svc_missing", {}, load)
+        second = await cache.get_or_load("service:svc_missing", {}, load)
+        return first, second, calls
+
+    assert asyncio.run(run()) == (None, None, 1)
+
+def test_load_errors_reach_every_waiter_and_are_not_cached():
+    async def run():
+        cache = ResponseCache(MemoryBackend())
+        loader = Loader(RuntimeError("mongo down"))
+        tasks = [asyncio.create_task(cache.get_or_load("services:list", {}, loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        loader.value = {"services": ["svc_1"]}
+        return results, await cache.get_or_load("services:list", {}, loader)
+
+    results, retried = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == {"services": ["svc_1"]}
+
+@pytest.mark.parametrize("value", [[], {}, 0])
+def test_falsy_results_are_cached_as_values(value):
+    async def run():
+        cache = ResponseCache(MemoryBackend())
+        loader = Loader(value)
+        loader.release.set()
+        return await cache.get_or_load("reviews:svc_1", {}, loader), await cache.get_or_load("reviews:svc_1", {}, loader), loader
+
+    first, second, loader = asyncio.run(run())
+    assert first == second == value
+    assert loader.calls == 1
+
+def test_settling_after_invalidate():
+    async def run():
+        cache = ResponseCache(MemoryBackend(), settle_seconds=90)
+        before = await cache.settling("services:list")
+        await cache.invalidate("services:list")
+        return before, await cache.settling("services:list"), await cache.settling("trending")
+
+    assert asyncio.run(run()) == (False, True, False)
+
+def test_settling_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+
+    async def run():
+        cache = ResponseCache(MemoryBackend(), settle_seconds=90)
+        await cache.invalidate("services:list")
+        now[0] += 91
+        return await cache.settling("services:list")
+
+    assert asyncio.run(run()) is False
+
+def test_no_settling_without_secondaries():
+    async def run():
+        cache = ResponseCache(MemoryBackend())
+        await cache.invalidate("services:list")
+        return await cache.settling("services:list")
+
+    assert asyncio.run(run()) is False
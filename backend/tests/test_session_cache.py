@@ -0,0 +1,98 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import session_cache
+from session_cache import RevocationFeed, SessionCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    # TLRUCache reads time.monotonic and the TTL cap reads time.time; drive both from one clock
+    clock = Clock()
+    monkeypatch.setattr(session_cache.time, "monotonic", clock)
+    monkeypatch.setattr(session_cache.time, "time", clock)
+    return clock
+
+def expires_in(clock: Clock, seconds: float) -> datetime:
+    return datetime.fromtimestamp(clock.now + seconds, timezone.utc)
+
+def test_ttl_is_capped_at_session_expiry(clock):
+    cache = SessionCache(ttl=60)
+    cache.set("tok_short", "user_a", expires_in(clock, 10))
+    cache.set("tok_long", "user_b", expires_in(clock, 3600))
+
+    clock.now += 11
+    assert cache.get("tok_short") == (False, None)
+    assert cache.get("tok_long") == (True, "user_b")
+    clock.now += 50
+    assert cache.get("tok_long") == (False, None)
+
+def test_expired_session_is_cached_as_negative(clock):
+    cache = SessionCache(ttl=60, negative_ttl=5)
+    cache.set("tok_expired", "user_a", expires_in(clock, -1))
+
+    assert cache.get("tok_expired") == (True, None)
+
+def test_negative_ttl(clock):
+    cache = SessionCache(ttl=60, negative_ttl=5)
+    cache.set("tok_bad", None)
+
+    assert cache.get("tok_bad") == (True, None)
+    clock.now += 6
+    assert cache.get("tok_bad") == (False, None)
+
+def test_invalidate_users(clock):
+    cache = SessionCache()
+    for token, user_id in (("tok_a1", "user_a"), ("tok_a2", "user_a"), ("tok_b", "user_b"), ("tok_c", "user_c")):
+        cache.set(token, user_id)
+
+    assert cache.invalidate_users({"user_a", "user_b"}) == 3
+    assert [cache.get(token)[0] for token in ("tok_a1", "tok_a2", "tok_b", "tok_c")] == [False, False, False, True]
+    assert cache.invalidate_users({"user_a"}) == 0
+
+class FakeRevocations:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query):
+        since = query["revoked_at"]["$gte"]
+
+        async def rows():
+            for doc in self.docs:
+                if doc["revoked_at"] >= since:
+                    yield doc
+        return rows()
+
+class FakeDB:
+    def __init__(self, docs):
+        self.session_revocations = FakeRevocations(docs)
+
+def test_revocation_feed_purges_other_workers_tokens():
+    cache = SessionCache()
+    cache.set("tok_a", "user_a")
+    cache.set("tok_b", "user_b")
+    feed = RevocationFeed(FakeDB([{"_id": "user_a", "revoked_at": datetime.now(timezone.utc)}]), cache)
+    feed._since = datetime.now(timezone.utc) - timedelta(seconds=5)
+
+    assert asyncio.run(feed.poll()) == 1
+    assert cache.get("tok_a") == (False, None)
+    assert cache.get("tok_b") == (True, "user_b")
+
+def test_lookup_read_before_revocation_is_not_cached():
+    cache = SessionCache()
+    read_at = time.time()
+    cache.revoke_users({"user_a": read_at + 1})
+    cache.set("tok_a", "user_a", read_at=read_at)
+    cache.set("tok_new", "user_a", read_at=read_at + 2)  # a login after the revocation
+
+    assert cache.get("tok_a") == (False, None)
+    assert cache.get("tok_new") == (True, "user_a")
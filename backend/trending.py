@@ -0,0 +1,191 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import math
+import os
+import uuid
+
+from creator_stats import PAID_STATES
+from db_indexes import INDEXES
+
+logger = logging.getLogger(__name__)
+
+# Ranked service feeds ("all", "category:<c>", "platform:<p>") materialized into
+# trending_services by a background refresh. Each refresh writes a fresh
+# collection and renames it over the old one, so readers always see one
+# complete ranking and the feed endpoint is a single indexed keyset query.
+
+COLLECTION = "trending_services"
+LEASE_ID = "trending_refresh"
+LN2 = math.log(2)
+DAY_MS = 24 * 60 * 60 * 1000
+
+@dataclass
+class TrendingWeights:
+    orders: float = 1.0
+    rating: float = 1.0
+    recency: float = 0.5
+    order_window_days: float = 14.0
+    order_half_life_days: float = 3.0
+    recency_half_life_days: float = 30.0
+    prior_count: float = 10.0
+    prior_mean: Optional[float] = None  # None: the catalog-wide mean rating
+
+    @classmethod
+    def from_env(cls) -> "TrendingWeights":
+        prior_mean = os.getenv('TRENDING_PRIOR_MEAN', '')
+        return cls(
+            orders=float(os.getenv('TRENDING_WEIGHT_ORDERS', '1.0')),
+            rating=float(os.getenv('TRENDING_WEIGHT_RATING', '1.0')),
+            recency=float(os.getenv('TRENDING_WEIGHT_RECENCY', '0.5')),
+            order_window_days=float(os.getenv('TRENDING_ORDER_WINDOW_DAYS', '14')),
+            order_half_life_days=float(os.getenv('TRENDING_ORDER_HALF_LIFE_DAYS', '3')),
+            recency_half_life_days=float(os.getenv('TRENDING_RECENCY_HALF_LIFE_DAYS', '30')),
+            prior_count=float(os.getenv('TRENDING_PRIOR_COUNT', '10')),
+            prior_mean=float(prior_mean) if prior_mean else None,
+        )
+
+def feed_name(category: Optional[str] = None, platform: Optional[str] = None) -> str:
+    if category:
+        return f"category:{category}"
+    if platform:
+        return f"platform:{platform}"
+    return "all"
+
+def score_service(service: Dict[str, Any], demand: float, prior_mean: float, weights: TrendingWeights, now: datetime) -> float:
+    """Decayed recent paid orders (log-damped) + Bayesian-average rating + listing recency."""
+    reviews = service.get("review_count") or 0
+    rating_sum = service.get("rating_sum")
+    if rating_sum is None:
+        rating_sum = (service.get("rating") or 0) * reviews
+    bayesian = (weights.prior_count * prior_mean + rating_sum) / (weights.prior_count + reviews) if weights.prior_count + reviews else 0.0
+    recency = 0.0
+    created_at = service.get("created_at")
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        age_days = max(0.0, (now - created_at).total_seconds() / 86400)
+        recency = math.exp(-LN2 * age_days / weights.recency_half_life_days)
+    return (
+        weights.orders * math.log1p(demand)
+        + weights.rating * bayesian / 5
+        + weights.recency * recency
+    )
+
+def demand_pipeline(now: datetime, weights: TrendingWeights) -> List[Dict[str, Any]]:
+    """Per service, paid orders in the window, each weighted by exp(-ln2 * age / half-life)."""
+    paid_at = {"$ifNull": ["$paid_at", "$created_at"]}
+    decay_per_ms = -LN2 / (weights.order_half_life_days * DAY_MS)
+    return [
+        {"$match": {
+            "status": {"$in": list(PAID_STATES)},
+            "created_at": {"$gte": now - timedelta(days=weights.order_window_days)},
+        }},
+        {"$group": {
+            "_id": "$service_id",
+            "demand": {"$sum": {"$exp": {"$multiply": [decay_per_ms, {"$subtract": [now, paid_at]}]}}},
+        }},
+    ]
+
+async def catalog_mean_rating(db: AsyncIOMotorDatabase) -> float:
+    rows = await db.services.aggregate([
+        {"$match": {"status": "active"}},
+        {"$group": {"_id": None, "rating_sum": {"$sum": "$rating_sum"}, "reviews": {"$sum": "$review_count"}}},
+    ]).to_list(length=1)
+    if rows and rows[0]["reviews"]:
+        return rows[0]["rating_sum"] / rows[0]["reviews"]
+    return 4.0
+
+async def refresh_trending(db: AsyncIOMotorDatabase, card_projection: Dict[str, Any], weights: TrendingWeights,
+                           batch_size: int = 1000) -> Dict[str, Any]:
+    """Score every active service and swap in a freshly built trending collection."""
+    now = datetime.now(timezone.utc)
+    demand = {
+        row["_id"]: row["demand"]
+        async for row in db.orders.aggregate(demand_pipeline(now, weights), allowDiskUse=True)
+    }
+    prior_mean = weights.prior_mean if weights.prior_mean is not None else await catalog_mean_rating(db)
+
+    staging = db[f"{COLLECTION}_build_{uuid.uuid4().hex[:8]}"]
+    projection = {**card_projection, "rating_sum": 1}
+    batch: List[Dict[str, Any]] = []
+    services = 0
+    try:
+        async for service in db.services.find({"status": "active"}, projection).batch_size(batch_size):
+            services += 1
+            score = round(score_service(service, demand.get(service["service_id"], 0.0), prior_mean, weights, now), 6)
+            service.pop("rating_sum", None)
+            service["score"] = score
+            for feed in {"all", feed_name(category=service.get("category")), feed_name(platform=service.get("platform"))}:
+                batch.append({**service, "feed": feed})
+            if len(batch) >= batch_size:
+                await staging.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await staging.insert_many(batch, ordered=False)
+        await staging.create_indexes(INDEXES[COLLECTION])
+        await staging.rename(COLLECTION, dropTarget=True)
+    finally:
+        await staging.drop()  # no-op once renamed
+    return {"services": services, "with_recent_orders": len(demand), "prior_mean": round(prior_mean, 4), "refreshed_at": now}
+
+class TrendingRefresher:
+    """Lifespan background task; a lease in job_leases lets one worker per interval do the refresh."""
+
+    def __init__(self, db: AsyncIOMotorDatabase, card_projection: Dict[str, Any], weights: TrendingWeights,
+                 interval: float = 300.0, on_refresh: Optional[Callable[[], Awaitable[None]]] = None):
+        self.db = db
+        self.card_projection = card_projection
+        self.weights = weights
+        self.interval = interval
+        self.on_refresh = on_refresh
+        self.holder = uuid.uuid4().hex
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _acquire_lease(self) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            await self.db.job_leases.find_one_and_update(
+                {"_id": LEASE_ID, "locked_until": {"$lte": now}},
+                {"$set": {"holder": self.holder, "locked_until": now + timedelta(seconds=self.interval)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False  # held by another worker until locked_until
+        return True
+
+    async def refresh_now(self) -> Dict[str, Any]:
+        self.last_report = await refresh_trending(self.db, self.card_projection, self.weights)
+        if self.on_refresh:
+            await self.on_refresh()
+        return self.last_report
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self._acquire_lease():
+                    report = await self.refresh_now()
+                    logger.info(f"Trending feed refreshed: {report}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Trending refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"interval": self.interval, "weights": asdict(self.weights), "last_refresh": self.last_report}
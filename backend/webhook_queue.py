@@ -0,0 +1,194 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime, timezone, timedelta
+import asyncio
+import logging
+import uuid
+
+from order_state import mark_orders_paid
+
+logger = logging.getLogger(__name__)
+
+# ==================== STRIPE WEBHOOK QUEUE ====================
+# The webhook route only verifies the signature and stores the event here,
+# keyed by Stripe's event id so redeliveries are dropped on insert. Workers
+# claim pending events in batches; orders move through order_state.mark_orders_paid
+# and payments with one bulk_write. All updates are guarded by the current
+# state, so duplicates and out-of-order deliveries are no-ops.
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+class WebhookQueue:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        workers: int = 2,
+        batch_size: int = 100,
+        max_attempts: int = 8,
+        poll_interval: float = 1.0,
+        lock_seconds: float = 60.0,
+        on_paid: Optional[Callable[[List[str], List[str]], Awaitable[None]]] = None,
+    ):
+        self.db = db
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lock_seconds = lock_seconds
+        self.on_paid = on_paid  # (paid order ids, completed checkout session ids)
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    @property
+    def events(self):
+        return self.db.stripe_events
+
+    async def enqueue(self, event_id: str, event_type: str, session_id: Optional[str],
+                      payment_status: Optional[str], metadata: Optional[Dict[str, Any]]) -> bool:
+        """Store a verified event. Returns False if this event id was already received."""
+        now = now_utc()
+        try:
+            await self.events.insert_one({
+                "_id": event_id,
+                "event_type": event_type,
+                "session_id": session_id,
+                "payment_status": payment_status,
+                "order_id": (metadata or {}).get("order_id"),
+                "status": PENDING,
+                "attempts": 0,
+                "received_at": now,
+                "next_attempt_at": now,
+            })
+        except DuplicateKeyError:
+            return False
+        self._wakeup.set()
+        return True
+
+    # ---------- workers ----------
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, worker: int) -> None:
+        while True:
+            try:
+                processed = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook worker {worker} failed: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self) -> List[Dict[str, Any]]:
+        now = now_utc()
+        claimable = {"$or": [
+            {"status": PENDING, "next_attempt_at": {"$lte": now}},
+            {"status": PROCESSING, "locked_until": {"$lte": now}},
+        ]}
+        ids = [doc["_id"] async for doc in self.events.find(claimable, {"_id": 1}).sort("received_at", 1).limit(self.batch_size)]
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        await self.events.update_many(
+            {"_id": {"$in": ids}, **claimable},
+            {"$set": {"status": PROCESSING, "claim": token, "locked_until": now + timedelta(seconds=self.lock_seconds)},
+             "$inc": {"attempts": 1}}
+        )
+        return await self.events.find({"claim": token, "status": PROCESSING}).to_list(length=self.batch_size)
+
+    async def process_batch(self) -> int:
+        batch = await self._claim()
+        if not batch:
+            return 0
+
+        payment_ops, paid_orders, paid_sessions = [], [], []
+        updated_at = now_utc()
+        for event in batch:
+            if event.get("payment_status") != "paid":
+                continue
+            if event.get("order_id"):
+                paid_orders.append(event["order_id"])
+            if event.get("session_id"):
+                paid_sessions.append(event["session_id"])
+                payment_ops.append(UpdateOne(
+                    {"session_id": event["session_id"], "payment_status": {"$ne": "completed"}},
+                    {"$set": {"payment_status": "completed", "updated_at": updated_at}}
+                ))
+
+        ids = [event["_id"] for event in batch]
+        try:
+            if paid_orders:
+                # creator stats are counted by whichever attempt actually moves each order
+                await mark_orders_paid(self.db, list(dict.fromkeys(paid_orders)))
+            if payment_ops:
+                await self.db.payment_transactions.bulk_write(payment_ops, ordered=False)
+        except PyMongoError as e:
+            await self._retry_later(batch, str(e))
+            return len(batch)
+
+        await self.events.update_many(
+            {"_id": {"$in": ids}},
+            {"$set": {"status": DONE, "processed_at": now_utc()}, "$unset": {"claim": "", "locked_until": "", "error": ""}}
+        )
+        if (paid_orders or paid_sessions) and self.on_paid:
+            await self.on_paid(paid_orders, paid_sessions)
+        return len(batch)
+
+    async def _retry_later(self, batch: List[Dict[str, Any]], error: str) -> None:
+        logger.warning(f"Webhook batch of {len(batch)} failed, will retry: {error}")
+        now = now_utc()
+        ops = []
+        for event in batch:
+            attempts = event.get("attempts", 1)
+            if attempts >= self.max_attempts:
+                update = {"$set": {"status": FAILED, "error": error}}
+            else:
+                delay = min(2 ** attempts, 300)
+                update = {"$set": {"status": PENDING, "error": error, "next_attempt_at": now + timedelta(seconds=delay)}}
+            update["$unset"] = {"claim": "", "locked_until": ""}
+            ops.append(UpdateOne({"_id": event["_id"]}, update))
+        await self.events.bulk_write(ops, ordered=False)
+
+    # ---------- replay ----------
+
+    async def replay(self, event_ids: Optional[List[str]] = None, status: Optional[str] = None,
+                     since: Optional[datetime] = None) -> int:
+        """Put matching events back on the queue; the guarded updates make this safe."""
+        query: Dict[str, Any] = {}
+        if event_ids:
+            query["_id"] = {"$in": event_ids}
+        if status:
+            query["status"] = status
+        if since:
+            query["received_at"] = {"$gte": since}
+        result = await self.events.update_many(
+            query,
+            {"$set": {"status": PENDING, "attempts": 0, "next_attempt_at": now_utc()},
+             "$unset": {"claim": "", "locked_until": "", "error": ""}}
+        )
+        self._wakeup.set()
+        return result.modified_count
+
+    async def stats(self) -> Dict[str, int]:
+        return {status: await self.events.count_documents({"status": status})
+                for status in (PENDING, PROCESSING, DONE, FAILED)}
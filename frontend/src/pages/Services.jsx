@@ -166,9 +166,9 @@ const Services = () => {
                       <span className="text-xs px-3 py-1 rounded-full bg-indigo-600/20 text-indigo-400">
                         {service.category.replace('_', ' ')}
                       </span>
-                      {service.tiers && service.tiers.length > 0 && (
+                      {(service.min_price ?? service.tiers?.[0]?.price) != null && (
                         <span className="font-semibold text-lg">
-                          From ${service.tiers[0].price}
+                          From ${service.min_price ?? service.tiers[0].price}
                         </span>
                       )}
                     </div>